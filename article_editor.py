@@ -8,6 +8,7 @@ import sys
 import tempfile
 import webbrowser
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, filedialog, scrolledtext
 from pathlib import Path
 
@@ -18,13 +19,51 @@ TEMPLATE_DIR = BASE_DIR / "templates"
 STYLE_PATH = TEMPLATE_DIR / "style.css"
 IMG_DIR = TEMPLATE_DIR / "img"
 
+# 入力が止まってからプレビューを描き直すまでの待ち時間と、変換結果を待つ間隔 (ms)
+PREVIEW_DEBOUNCE_MS = 150
+PREVIEW_POLL_MS = 15
+
 sys.path.insert(0, str(BASE_DIR))
 from build_site import (
-    simple_markdown_to_html,
+    render_markdown,
     parse_markdown_frontmatter,
     DIALOGUE_CHARS,
 )
 
+PREVIEW_DIALOGUE_RE = re.compile(r'>\s*(scala|kotori)\s*:\s*(.+)')
+PREVIEW_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+
+# プレビュー用の行変換は Tk のメインループを止めないよう別スレッドで行う
+PREVIEW_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+
+def preview_segments(line: str, name_key: str) -> list[tuple[str, str]]:
+    """Markdown 1行をプレビューの (テキスト, タグ) 列に変換する（1要素 = プレビュー1行）"""
+    stripped = line.strip()
+
+    # 対話
+    m = PREVIEW_DIALOGUE_RE.match(stripped) if stripped.startswith(">") else None
+    if m:
+        char_id = m.group(1)
+        content = PREVIEW_BOLD_RE.sub(r'\1', m.group(2))
+        name = DIALOGUE_CHARS[char_id].get(name_key, char_id)
+        return [(f"  {name}:\n", f"{char_id}_name"), (f"  {content}\n", "dialogue")]
+
+    if stripped.startswith("### "):
+        return [(f"{stripped[4:]}\n", "h3")]
+    if stripped.startswith("## "):
+        return [(f"{stripped[3:]}\n", "h2")]
+    if stripped.startswith("# "):
+        return [(f"{stripped[2:]}\n", "h1")]
+    if stripped == "":
+        return [("\n", "spacer")]
+    clean = PREVIEW_BOLD_RE.sub(r'\1', stripped)
+    return [(f"{clean}\n", "body")]
+
+
+def render_preview_lines(lines: list[str], name_key: str) -> list[list[tuple[str, str]]]:
+    return [preview_segments(line, name_key) for line in lines]
+
 
 class ArticleEditor(tk.Tk):
     def __init__(self):
@@ -99,7 +138,7 @@ class ArticleEditor(tk.Tk):
         combo = ttk.Combobox(frame, textvariable=self.lang_var,
                              values=["ja", "en"], width=4, state="readonly")
         combo.grid(row=0, column=7)
-        combo.bind("<<ComboboxSelected>>", lambda e: self._update_preview())
+        combo.bind("<<ComboboxSelected>>", lambda e: self._refresh_preview_all())
 
     # ───── ツールバー ─────
     def _build_toolbar(self):
@@ -164,7 +203,13 @@ class ArticleEditor(tk.Tk):
         self.preview.tag_configure("body", font=("Yu Gothic UI", 11), foreground="#c7d5e0")
         self.preview.tag_configure("spacer", font=("Yu Gothic UI", 6))
 
-        self.editor.bind("<KeyRelease>", self._update_preview)
+        # 差分プレビューの状態: 行ごとの変換結果と、まだ反映していない行範囲（先頭・末尾の変わっていない行数）
+        self._line_renders = []
+        self._preview_dirty = (0, 0)
+        self._preview_generation = 0
+        self._preview_after = None
+        self._preview_job = None
+        self._watch_editor_changes()
 
     # ───── ステータスバー ─────
     def _build_status_bar(self):
@@ -294,41 +339,100 @@ class ArticleEditor(tk.Tk):
         self.status_var.set(f"保存: {path}")
 
     # ───── ライブプレビュー ─────
+    def _watch_editor_changes(self):
+        """エディタの Tcl コマンドを差し替え、insert / delete のたびに変わった行範囲を記録する"""
+        widget = self.editor._w
+        self._editor_orig = widget + "_orig"
+        self.tk.call("rename", widget, self._editor_orig)
+        self.tk.createcommand(widget, self._editor_command)
+
+    def _editor_command(self, *args):
+        op = args[0] if args else ""
+        if op in ("insert", "delete", "replace"):
+            try:
+                self._note_edit(op, args[1:])
+            except tk.TclError:
+                pass  # 選択が無いときの sel.first 等。元のコマンドも同じエラーを返すので記録しない
+        elif op == "edit" and len(args) > 1 and args[1] in ("undo", "redo"):
+            self._mark_preview_dirty(0, 0)
+        # 元のコマンドのエラーはそのまま Tk に返す（Tk のバインディングが catch する前提の操作がある）
+        result = self.tk.call((self._editor_orig,) + args)
+        if op in ("insert", "delete", "replace") or (op == "edit" and len(args) > 1 and args[1] in ("undo", "redo")):
+            self._update_preview()
+        return result
+
+    def _line_of(self, index: str) -> int:
+        return int(str(self.tk.call(self._editor_orig, "index", index)).split(".")[0])
+
+    def _note_edit(self, op: str, args: tuple):
+        total = self._line_of("end-1c")
+        first = min(self._line_of(args[0]), total)
+        if op == "insert":
+            last = first
+        elif len(args) > 1 and op == "delete":
+            last = max(self._line_of(i) for i in args[1:])
+        elif op == "replace":
+            last = self._line_of(args[1])
+        else:
+            last = self._line_of(f"{args[0]}+1c")
+        self._mark_preview_dirty(first - 1, total - min(last, total))
+
+    def _mark_preview_dirty(self, prefix: int, suffix: int):
+        self._preview_generation += 1
+        if self._preview_dirty is None:
+            self._preview_dirty = (prefix, suffix)
+        else:
+            self._preview_dirty = (min(prefix, self._preview_dirty[0]), min(suffix, self._preview_dirty[1]))
+
+    def _refresh_preview_all(self):
+        self._mark_preview_dirty(0, 0)
+        self._update_preview()
+
     def _update_preview(self, event=None):
-        text = self.editor.get("1.0", "end-1c")
-        lang = self.lang_var.get()
-        name_key = f"name_{lang}"
+        """プレビュー更新を予約する（入力が止まってから、変わった行範囲だけを描き直す）"""
+        if self._preview_after is not None:
+            self.after_cancel(self._preview_after)
+        self._preview_after = self.after(PREVIEW_DEBOUNCE_MS, self._start_preview_render)
+
+    def _start_preview_render(self):
+        self._preview_after = None
+        if self._preview_dirty is None or self._preview_job is not None:
+            return
+        prefix, suffix = self._preview_dirty
+        total = self._line_of("end-1c")
+        text = self.editor.get(f"{prefix + 1}.0", f"{total - suffix}.end")
+        name_key = f"name_{self.lang_var.get()}"
+        future = PREVIEW_EXECUTOR.submit(render_preview_lines, text.split("\n"), name_key)
+        self._preview_job = (future, prefix, suffix, self._preview_generation)
+        self.after(PREVIEW_POLL_MS, self._finish_preview_render)
+
+    def _finish_preview_render(self):
+        future, prefix, suffix, generation = self._preview_job
+        if not future.done():
+            self.after(PREVIEW_POLL_MS, self._finish_preview_render)
+            return
+        self._preview_job = None
+        if generation != self._preview_generation:
+            # 変換中にさらに編集された（未反映の範囲は残っているので描き直しを予約し直す）
+            self._update_preview()
+            return
 
-        self.preview.config(state="normal")
-        self.preview.delete("1.0", "end")
-
-        for line in text.split("\n"):
-            stripped = line.strip()
-
-            # 対話
-            m = re.match(r'^>\s*(scala|kotori)\s*:\s*(.+)', stripped)
-            if m:
-                char_id = m.group(1)
-                content = re.sub(r'\*\*(.+?)\*\*', r'\1', m.group(2))
-                name = DIALOGUE_CHARS[char_id].get(name_key, char_id)
-                self.preview.insert("end", f"  {name}:\n", f"{char_id}_name")
-                self.preview.insert("end", f"  {content}\n", "dialogue")
-                continue
-
-            if stripped.startswith("### "):
-                self.preview.insert("end", f"{stripped[4:]}\n", "h3")
-            elif stripped.startswith("## "):
-                self.preview.insert("end", f"{stripped[3:]}\n", "h2")
-            elif stripped.startswith("# "):
-                self.preview.insert("end", f"{stripped[2:]}\n", "h1")
-            elif stripped == "":
-                self.preview.insert("end", "\n", "spacer")
-            else:
-                clean = re.sub(r'\*\*(.+?)\*\*', r'\1', stripped)
-                self.preview.insert("end", f"{clean}\n", "body")
+        renders = future.result()
+        old = self._line_renders
+        end = len(old) - suffix
+        start_line = sum(len(r) for r in old[:prefix])
+        end_line = start_line + sum(len(r) for r in old[prefix:end])
+        chunks = [part for segments in renders for segment in segments for part in segment]
 
+        self.preview.config(state="normal")
+        self.preview.delete(f"{start_line + 1}.0", f"{end_line + 1}.0")
+        if chunks:
+            self.preview.insert(f"{start_line + 1}.0", *chunks)
         self.preview.config(state="disabled")
 
+        old[prefix:end] = renders
+        self._preview_dirty = None
+
     # ───── ブラウザプレビュー ─────
     def preview_browser(self):
         md_text = self.editor.get("1.0", "end-1c")
@@ -338,7 +442,7 @@ class ArticleEditor(tk.Tk):
 
         # 画像パスをローカルファイルに
         img_uri = IMG_DIR.as_uri() + "/"
-        html_body = simple_markdown_to_html(md_text, lang=lang, img_prefix=img_uri)
+        html_body, pet_html = render_markdown(md_text, lang=lang, img_prefix=img_uri)
 
         # CSS読み込み
         css = STYLE_PATH.read_text(encoding="utf-8") if STYLE_PATH.exists() else ""
@@ -369,6 +473,7 @@ class ArticleEditor(tk.Tk):
     </header>
     {html_body}
   </article>
+  {pet_html}
   <div class="emotelab-credit">
     <p>{'Characters created with' if lang == 'en' else 'キャラクターは'}
        <a href="https://store.steampowered.com/app/4301100/EmoteLab/" target="_blank">EmoteLab</a>
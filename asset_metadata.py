@@ -0,0 +1,73 @@
+"""
+記事が参照する Steam アプリのメタデータ（data/asset-metadata.json）。
+
+記事のフロントマター `emotelab:` と本文の `!steam[appid](名前)` カードが参照する appid について、
+fetch_steam.py がヘッダー画像 URL と名前を取得して保存する。build_site.py はこれを読むだけで、
+ビルド中に Store API へは問い合わせない。
+
+{"assets": {"appid": {"name": ..., "header_image": ..., "fetched_at": ...}, ...}}
+
+外部依存: なし（stdlib のみ）
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+ASSET_METADATA_PATH = BASE_DIR / "data" / "asset-metadata.json"
+CONTENT_DIRS = (BASE_DIR / "content", BASE_DIR / "content" / "en")
+
+FRONTMATTER_RE = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+EMOTELAB_RE = re.compile(r'^emotelab:\s*(\d+)\s*$', re.MULTILINE)
+CARD_RE = re.compile(r'^\s*!steam\[(\d+)\]\(.+?\)\s*$', re.MULTILINE)
+
+
+def default_header_image(appid: int | str) -> str:
+    """メタデータがないときに使う CDN 上の既定パス"""
+    return f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/header.jpg"
+
+
+def referenced_appids(text: str) -> set[str]:
+    """記事1本（フロントマター込み）が参照する emotelab / カードの appid"""
+    appids = set()
+    match = FRONTMATTER_RE.match(text)
+    if match:
+        appids.update(EMOTELAB_RE.findall(match.group(1)))
+        text = text[match.end():]
+    appids.update(CARD_RE.findall(text))
+    return appids
+
+
+def collect_references(content_dirs=CONTENT_DIRS) -> dict[str, list[str]]:
+    """appid → 参照している記事ファイル"""
+    refs: dict[str, list[str]] = {}
+    for directory in content_dirs:
+        if not directory.exists():
+            continue
+        for md_file in sorted(directory.glob("*.md")):
+            name = md_file.relative_to(BASE_DIR).as_posix() if md_file.is_relative_to(BASE_DIR) else md_file.name
+            for appid in referenced_appids(md_file.read_text(encoding="utf-8")):
+                refs.setdefault(appid, []).append(name)
+    return dict(sorted(refs.items(), key=lambda item: int(item[0])))
+
+
+def load(path: Path = ASSET_METADATA_PATH) -> dict[str, dict]:
+    """appid（文字列）→ {name, header_image, fetched_at}。ファイルが無い・壊れているときは空"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    assets = data.get("assets")
+    return assets if isinstance(assets, dict) else {}
+
+
+def save(assets: dict[str, dict], path: Path = ASSET_METADATA_PATH):
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"assets": dict(sorted(assets.items(), key=lambda item: int(item[0])))},
+                  f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
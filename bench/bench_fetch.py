@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+fetch_steam.py のエンドツーエンド・ベンチマーク（ネットワーク不要）
+
+bench/steam_standin.py のスタンドインをこのプロセス内で起動し、一時ディレクトリに置いた
+fetch_steam.py を --base-url でそこへ向けて実行する。ゲーム数ごとに
+所要時間・スループット（本/秒）・リクエスト数・転送量を計測する。
+
+合成ゲームは記録済みの appid を先に使い、足りない分は 9000000 番台の appid を振る
+（応答はスタンドインが記録済みレコードを使い回して作る）。
+
+Usage:
+  python bench/bench_fetch.py                               # 85 / 1,000 / 10,000 本
+  python bench/bench_fetch.py --sizes 85 --latency 0.05     # 遅延ありで 85 本だけ
+  python bench/bench_fetch.py --json bench-fetch.json       # 結果を JSON で保存（CI 用）
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "bench"))
+
+import steam_standin  # noqa: E402
+
+# fetch_steam.py の実行に必要なモジュール
+FETCH_MODULES = ("fetch_steam.py", "snapshot_store.py", "asset_metadata.py", "price_history.py")
+SYNTHETIC_APPID_BASE = 9_000_000
+DEFAULT_SIZES = (85, 1000, 10000)
+
+
+def synthetic_games(records: list[dict], count: int) -> list[dict]:
+    appids = [r["appid"] for r in records][:count]
+    appids += [SYNTHETIC_APPID_BASE + n for n in range(count - len(appids))]
+    return [{"appid": appid, "slug": f"game-{appid}", "recommend": "all"} for appid in appids]
+
+
+def prepare_workdir(workdir: Path, games: list[dict]):
+    for name in FETCH_MODULES:
+        shutil.copy2(ROOT / name, workdir / name)
+    (workdir / "data").mkdir()
+    with open(workdir / "games.json", "w", encoding="utf-8") as f:
+        json.dump({"games": games}, f, ensure_ascii=False)
+
+
+def run_once(server: steam_standin.StandinServer, records: list[dict], size: int, args) -> dict:
+    """size 本のゲームで fetch_steam.py を1回実行して計測する"""
+    games = synthetic_games(records, size)
+    with tempfile.TemporaryDirectory(prefix="bench-fetch-") as tmp:
+        workdir = Path(tmp)
+        prepare_workdir(workdir, games)
+        server.reset_counters()
+        command = [
+            sys.executable, "fetch_steam.py", "--full",
+            "--base-url", server.base_url,
+            "--workers", str(args.workers),
+            "--rate", str(args.rate),
+            "--burst", str(args.burst),
+        ]
+        start = time.perf_counter()
+        proc = subprocess.run(command, cwd=workdir, capture_output=True, text=True, encoding="utf-8")
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            print(proc.stdout[-2000:])
+            print(proc.stderr[-2000:], file=sys.stderr)
+            raise SystemExit(f"fetch_steam.py が失敗しました ({size}本, 終了コード {proc.returncode})")
+        fetched = sum(1 for p in (workdir / "data" / "snapshots").glob("*.json") if p.stem.isdigit())
+
+    counters = server.counters()
+    return {
+        "games": size,
+        "fetched": fetched,
+        "seconds": round(elapsed, 3),
+        "games_per_sec": round(fetched / elapsed, 2) if elapsed > 0 else 0.0,
+        "requests": counters["requests"],
+        "requests_per_sec": round(counters["requests"] / elapsed, 1) if elapsed > 0 else 0.0,
+        "bytes": counters["bytes"],
+        "by_route": counters["by_route"],
+        "statuses": counters["statuses"],
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="fetch_steam.py のエンドツーエンド・ベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="計測するゲーム数")
+    parser.add_argument("--workers", type=int, default=16, help="fetch_steam.py の --workers")
+    parser.add_argument("--rate", type=float, default=1000, help="fetch_steam.py の --rate（スタンドインなので高め）")
+    parser.add_argument("--burst", type=int, default=50, help="fetch_steam.py の --burst")
+    parser.add_argument("--latency", type=float, default=0.0, help="スタンドインの1リクエストごとの遅延 (秒)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="スタンドインが 500 を返す割合")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="スタンドインが 429 を返す割合")
+    parser.add_argument("--page-kib", type=int, default=steam_standin.DEFAULT_PAGE_KIB, help="ストアページの大きさ")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="結果を JSON で書き出すパス")
+    args = parser.parse_args(argv)
+
+    records = steam_standin.load_records()
+    data = steam_standin.StandinData(records, page_kib=args.page_kib)
+    server = steam_standin.start(data, latency=args.latency, error_rate=args.error_rate,
+                                 throttle_rate=args.throttle_rate, seed=args.seed)
+    print(f"スタンドイン: {server.base_url} (レコード {len(records)}件, 遅延 {args.latency * 1000:.0f}ms, "
+          f"500 {args.error_rate:.0%}, 429 {args.throttle_rate:.0%})")
+    print(f"fetch_steam.py: ワーカー {args.workers}, {args.rate} req/s, バースト {args.burst}\n")
+
+    results = []
+    try:
+        print(f"{'本数':>7} {'取得':>7} {'秒':>8} {'本/秒':>8} {'req':>7} {'req/秒':>8} {'転送 MiB':>9}")
+        for size in args.sizes:
+            result = run_once(server, records, size, args)
+            results.append(result)
+            print(f"{result['games']:>7} {result['fetched']:>7} {result['seconds']:>8.1f} {result['games_per_sec']:>8.1f} "
+                  f"{result['requests']:>7} {result['requests_per_sec']:>8.0f} {result['bytes'] / 1024 / 1024:>9.1f}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "settings": {k: v for k, v in vars(args).items() if k != "json"},
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\n結果を保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
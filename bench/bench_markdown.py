@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+simple_markdown_to_html のベンチマーク（旧: 行ごと・インラインごとに re.match / re.sub / 新: 事前コンパイル + 行頭で分岐）
+
+content/ の記事と合成コーパスで、出力が旧実装と一致することを確かめてから MB/s を比べる。
+
+Usage:
+  python bench/bench_markdown.py                 # content/ + 合成 10 MB
+  python bench/bench_markdown.py --size 2        # 合成コーパスを 2 MB に
+  python bench/bench_markdown.py --repeat 5
+"""
+
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from build_site import (  # noqa: E402
+    CONTENT_DIR,
+    CONTENT_EN_DIR,
+    DIALOGUE_CHARS,
+    PET_SAFETY_LABELS,
+    parse_markdown_frontmatter,
+    simple_markdown_to_html,
+)
+
+
+def legacy_inline_markdown(text: str) -> str:
+    """旧実装: 3回の re.sub（毎回パターンを re のキャッシュから引く）"""
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    text = re.sub(r'\*(.+?)\*', r'<em>\1</em>', text)
+    text = re.sub(r'\[(.+?)\]\((.+?)\)', r'<a href="\2">\1</a>', text)
+    return text
+
+
+def legacy_markdown_to_html(md: str, lang: str = "ja", img_prefix: str = "../", pet_safety: str = "") -> str:
+    """旧実装: 1行ごとに最大4回の re.match（行頭の文字で候補を絞らない）"""
+    lines = md.split("\n")
+    html_lines = []
+    in_paragraph = False
+    in_profile = False
+    in_pet_safety = False
+    profile_char = None
+    profile_lines = []
+
+    def close_paragraph():
+        nonlocal in_paragraph
+        if in_paragraph:
+            html_lines.append("</p>")
+            in_paragraph = False
+
+    def close_pet_safety():
+        nonlocal in_pet_safety
+        if in_pet_safety:
+            html_lines.append("</div>")
+            in_pet_safety = False
+
+    for line in lines:
+        stripped = line.strip()
+
+        # プロフィール開始: >> scala / >> kotori
+        profile_start = re.match(r'^>>\s*(scala|kotori)\s*$', stripped)
+        if profile_start:
+            close_paragraph()
+            in_profile = True
+            profile_char = profile_start.group(1)
+            profile_lines = []
+            continue
+
+        # プロフィール終了: <<
+        if stripped == "<<" and in_profile:
+            char = DIALOGUE_CHARS[profile_char]
+            name = char[f"name_{lang}"]
+            full_img = char["img"].replace(".png", "-full.png")
+            paras = []
+            buf = []
+            for pl in profile_lines:
+                if pl.strip() == "":
+                    if buf:
+                        paras.append(" ".join(buf))
+                        buf = []
+                else:
+                    buf.append(legacy_inline_markdown(pl.strip()))
+            if buf:
+                paras.append(" ".join(buf))
+            body_html = "".join(f"<p>{p}</p>" for p in paras)
+            html_lines.append(
+                f'<div class="profile-card">'
+                f'<img src="{img_prefix}{full_img}" alt="{name}" class="profile-img">'
+                f'<div class="profile-info">'
+                f'<div class="profile-name">{name}</div>'
+                f'<div class="profile-text">{body_html}</div>'
+                f'</div></div>'
+            )
+            in_profile = False
+            profile_char = None
+            profile_lines = []
+            continue
+
+        if in_profile:
+            profile_lines.append(line)
+            continue
+
+        # 対話記法: > scala: セリフ  / > kotori: セリフ
+        dialogue_match = re.match(r'^>\s*(scala|kotori)\s*:\s*(.+)', stripped)
+        if dialogue_match:
+            close_paragraph()
+            char_id = dialogue_match.group(1)
+            text = legacy_inline_markdown(dialogue_match.group(2).strip())
+            char = DIALOGUE_CHARS[char_id]
+            name = char[f"name_{lang}"]
+            side = char["side"]
+            html_lines.append(
+                f'<div class="dialogue dialogue-{side}">'
+                f'<img src="{img_prefix}{char["img"]}" alt="{name}" class="dialogue-avatar">'
+                f'<div class="dialogue-bubble">'
+                f'<span class="dialogue-name">{name}</span>'
+                f'{text}'
+                f'</div></div>'
+            )
+            continue
+
+        # Steam OGP カード: !steam[appid](ゲーム名)
+        steam_match = re.match(r'^!steam\[(\d+)\]\((.+?)\)\s*$', stripped)
+        if steam_match:
+            close_paragraph()
+            s_appid = steam_match.group(1)
+            s_name = steam_match.group(2)
+            html_lines.append(
+                f'<a href="https://store.steampowered.com/app/{s_appid}/" target="_blank" class="steam-ogp-card">'
+                f'<img src="https://cdn.akamai.steamstatic.com/steam/apps/{s_appid}/header.jpg" alt="{s_name}" class="steam-ogp-img">'
+                f'<span class="steam-ogp-name">{s_name}</span>'
+                f'</a>'
+            )
+            continue
+
+        # 画像: ![alt](src)
+        img_match = re.match(r'^!\[(.+?)\]\((.+?)\)\s*$', stripped)
+        if img_match:
+            close_paragraph()
+            alt = img_match.group(1)
+            src = img_match.group(2)
+            if src.startswith("img/"):
+                src = img_prefix + src
+            html_lines.append(
+                f'<figure class="article-figure">'
+                f'<img src="{src}" alt="{alt}" class="article-img">'
+                f'<figcaption>{alt}</figcaption>'
+                f'</figure>'
+            )
+            continue
+
+        # 見出し
+        if stripped.startswith("### "):
+            close_paragraph()
+            html_lines.append(f"<h3>{legacy_inline_markdown(stripped[4:])}</h3>")
+        elif stripped.startswith("## "):
+            close_paragraph()
+            heading_text = stripped[3:]
+            if "犬猫" in heading_text:
+                close_pet_safety()
+                labels = PET_SAFETY_LABELS.get(lang, PET_SAFETY_LABELS["ja"])
+                pet_label = labels.get(pet_safety, labels.get("mild", ""))
+                level_class = f"pet-safety-{pet_safety}" if pet_safety else "pet-safety-mild"
+                html_lines.append(
+                    f'<div class="pet-safety-section {level_class}">'
+                    f'<div class="pet-safety-header">'
+                    f'<span class="pet-safety-label">{pet_label}</span>'
+                    f'</div>'
+                )
+                in_pet_safety = True
+            else:
+                close_pet_safety()
+                html_lines.append(f"<h2>{legacy_inline_markdown(heading_text)}</h2>")
+        elif stripped.startswith("# "):
+            close_paragraph()
+            close_pet_safety()
+            html_lines.append(f"<h1>{legacy_inline_markdown(stripped[2:])}</h1>")
+        elif stripped == "":
+            close_paragraph()
+        else:
+            processed = legacy_inline_markdown(stripped)
+            if not in_paragraph:
+                html_lines.append("<p>")
+                in_paragraph = True
+            html_lines.append(processed)
+
+    close_paragraph()
+    close_pet_safety()
+    return "\n".join(html_lines)
+
+
+SYNTHETIC_LINES = [
+    "> scala: やあ、今日は**セール情報**を持ってきたよ。[ストアページ](https://store.steampowered.com/)も見てね",
+    "> kotori: わー、*安く*なってますね！",
+    "> scala:もう少し詳しく見ていこう",
+    "## ゲームの概要",
+    "### 良いところ",
+    "# 大見出し",
+    "## 犬猫の無事度",
+    "!steam[413150](Stardew Valley)",
+    "![スクリーンショット](img/shot.png)",
+    "![外部画像](https://example.com/a.png)",
+    "普通の段落の文章。記号を含まない行がいちばん多い。",
+    "二行目も段落の続き。価格は 1,980 円。",
+    "**太字**と*斜体*と[リンク](https://example.com/)を含む行",
+    "[**太字のリンク**](https://example.com/b) と **[リンク入り太字](https://example.com/c)**",
+    "**閉じない太字 * と 単独の * 記号",
+    "配列っぽい [a, b] と (c) は変換されない",
+    "",
+    "",
+    "<<",
+    ">> scala",
+    "プロフィールの本文。**強調**もできる。",
+    "",
+    "二段落目",
+    "<<",
+    "> nobody: 未知のキャラは段落になる",
+    "> 引用のような行",
+]
+
+
+def synthetic_corpus(size_mb: float) -> list[str]:
+    """記事と同じ記法を混ぜた合成 Markdown（約 20 KB の文書に分けて合計 size_mb MB）"""
+    rng = random.Random(0)
+    target = int(size_mb * 1024 * 1024)
+    docs = []
+    total = 0
+    while total < target:
+        lines = [rng.choice(SYNTHETIC_LINES) for _ in range(300)]
+        doc = "\n".join(lines)
+        docs.append(doc)
+        total += len(doc.encode("utf-8"))
+    return docs
+
+
+def content_corpus() -> list[tuple[str, str, str]]:
+    """content/ の記事本文（本文, 言語, pet_safety）"""
+    docs = []
+    for directory, lang in ((CONTENT_DIR, "ja"), (CONTENT_EN_DIR, "en")):
+        for md_file in sorted(directory.glob("*.md")):
+            meta, body = parse_markdown_frontmatter(md_file.read_text(encoding="utf-8"))
+            docs.append((body, lang, meta.get("pet_safety", "")))
+    return docs
+
+
+def measure(func, docs: list[tuple[str, str, str]], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body, lang, pet in docs:
+            func(body, lang=lang, pet_safety=pet)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def compare(label: str, docs: list[tuple[str, str, str]], repeat: int):
+    mismatched = [i for i, (body, lang, pet) in enumerate(docs)
+                  if legacy_markdown_to_html(body, lang=lang, pet_safety=pet) != simple_markdown_to_html(body, lang=lang, pet_safety=pet)]
+    size = sum(len(body.encode("utf-8")) for body, _, _ in docs) / 1024 / 1024
+    old = measure(legacy_markdown_to_html, docs, repeat)
+    new = measure(simple_markdown_to_html, docs, repeat)
+    print(f"{label}: {len(docs)}文書 {size:.2f} MB  出力一致: {'OK' if not mismatched else f'NG ({len(mismatched)}件)'}")
+    print(f"  旧: {old * 1000:8.1f} ms  {size / old:6.2f} MB/s")
+    print(f"  新: {new * 1000:8.1f} ms  {size / new:6.2f} MB/s  ({old / new:.2f}x)")
+    return not mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Markdown 変換のベンチマーク")
+    parser.add_argument("--size", type=float, default=10, help="合成コーパスの大きさ (MB)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ok = compare("content/", content_corpus(), max(args.repeat, 20))
+    synthetic = [(doc, "ja", "mild") for doc in synthetic_corpus(args.size)]
+    ok = compare("合成コーパス", synthetic, args.repeat) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
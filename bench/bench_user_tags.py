@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+fetch_user_tags のタグ抽出ベンチマーク（旧: 全文読み込み + 正規表現 / 新: TagArrayScanner）
+
+保存済みストアページ（*.html）ごとに、読み込んだバイト数と抽出時間を比較する。
+
+Usage:
+  python bench/bench_user_tags.py --save bench/pages 413150 391540   # ストアページを保存
+  python bench/bench_user_tags.py --pages bench/pages                # 保存済みページで計測
+  python bench/bench_user_tags.py --synthetic 20                     # 合成ページで計測（オフライン）
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fetch_steam import STORE_PAGE_HEADERS, STREAM_CHUNK_SIZE, TagArrayScanner, http_get  # noqa: E402
+
+
+def legacy_extract(page: bytes) -> tuple[list, int]:
+    """旧実装: ページ全体をデコードして re.DOTALL の最短一致で探す"""
+    html = page.decode("utf-8")
+    match = re.search(r'InitAppTagModal\(\s*\d+,\s*(\[.*?\])', html, re.DOTALL)
+    return (json.loads(match.group(1)) if match else []), len(page)
+
+
+def streaming_extract(page: bytes) -> tuple[list, int]:
+    """新実装: STREAM_CHUNK_SIZE ずつ渡し、配列が閉じたら読み込みをやめる"""
+    scanner = TagArrayScanner()
+    read = 0
+    for start in range(0, len(page), STREAM_CHUNK_SIZE):
+        chunk = page[start:start + STREAM_CHUNK_SIZE]
+        read += len(chunk)
+        if scanner.feed(chunk):
+            break
+    return scanner.result(), read
+
+
+def synthetic_pages(count: int, size: int = 600_000) -> dict[str, bytes]:
+    """ストアページ相当の大きさ・タグ位置（全体の 55% 付近）の合成ページを作る"""
+    rng = random.Random(0)
+    pages = {}
+    for n in range(count):
+        tags = [{"tagid": rng.randint(1, 30000), "name": f"Tag {i}", "count": rng.randint(10, 5000), "browseable": True}
+                for i in range(20)]
+        script = f"InitAppTagModal( {n}, {json.dumps(tags)}, [], 'https://store.steampowered.com/tag/', {n}, false );"
+        filler = "<div class=\"block\"><p>" + "lorem ipsum dolor sit amet " * 8 + "</p></div>\n"
+        head = filler * int(size * 0.55 / len(filler))
+        tail = filler * int(size * 0.45 / len(filler))
+        pages[f"synthetic-{n}"] = (head + f"<script>{script}</script>\n" + tail).encode()
+    return pages
+
+
+def load_pages(directory: Path) -> dict[str, bytes]:
+    return {p.stem: p.read_bytes() for p in sorted(directory.glob("*.html"))}
+
+
+def save_pages(directory: Path, appids: list[str]):
+    directory.mkdir(parents=True, exist_ok=True)
+    for appid in appids:
+        body = http_get(f"https://store.steampowered.com/app/{appid}", "storepage", headers=STORE_PAGE_HEADERS, cache=False)
+        (directory / f"{appid}.html").write_bytes(body)
+        print(f"  保存: {appid}.html ({len(body) / 1024:.0f} KiB)")
+
+
+def measure(func, page: bytes, repeat: int) -> tuple[list, int, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tags, read = func(page)
+        times.append(time.perf_counter() - start)
+    return tags, read, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ユーザータグ抽出のベンチマーク")
+    parser.add_argument("--pages", type=Path, default=ROOT / "bench" / "pages", help="保存済みストアページのディレクトリ")
+    parser.add_argument("--synthetic", type=int, default=0, help="合成ページ数（保存済みページの代わりに使う）")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", nargs="+", metavar=("DIR", "APPID"), help="ストアページを DIR に保存して終了")
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(Path(args.save[0]), args.save[1:])
+        return
+
+    pages = synthetic_pages(args.synthetic) if args.synthetic else load_pages(args.pages)
+    if not pages:
+        print(f"ページがありません: {args.pages}（--save で保存するか --synthetic N を指定）")
+        return
+
+    print(f"{'page':<20} {'旧 KiB':>8} {'旧 ms':>8} {'新 KiB':>8} {'新 ms':>8}  tags")
+    totals = [0, 0.0, 0, 0.0]
+    for name, page in pages.items():
+        old_tags, old_read, old_time = measure(legacy_extract, page, args.repeat)
+        new_tags, new_read, new_time = measure(streaming_extract, page, args.repeat)
+        same = "一致" if old_tags == new_tags else "不一致"
+        print(f"{name:<20} {old_read / 1024:>8.0f} {old_time * 1000:>8.2f} {new_read / 1024:>8.0f} {new_time * 1000:>8.2f}  {len(new_tags)} ({same})")
+        for i, v in enumerate((old_read, old_time, new_read, new_time)):
+            totals[i] += v
+    n = len(pages)
+    print(f"\n1本あたり平均: 旧 {totals[0] / n / 1024:.0f} KiB / {totals[1] / n * 1000:.2f} ms, "
+          f"新 {totals[2] / n / 1024:.0f} KiB / {totals[3] / n * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
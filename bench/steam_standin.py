@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Steam ストアのローカル・スタンドインサーバー（fetch_steam.py をオフラインで動かす・計測する用）
+
+fetch_steam.py が使う4種類のエンドポイントに応答する:
+  /api/appdetails?appids=...            詳細（1件）/ filters=price_overview なら複数件の価格
+  /appreviews/{appid}                   レビュー統計 (query_summary)
+  /tagdata/populartags/{lang}           タグ辞書
+  /app/{appid}                          ストアページ（InitAppTagModal( appid, [...] を含む HTML）
+
+応答は data/snapshots/{appid}.json の記録済みレコードを API の形に戻して作る。
+記録に無い appid（合成ゲーム）は appid から決まるレコードを使い回す。
+--replay-cache を指定すると、fetch_steam.py の HTTP キャッシュ（data/cache/http）に
+本物の応答が残っている URL はその本文をそのまま返す。
+
+詳細の説明文・ストアページの大きさは本物に近づけるための埋め草で調整する（--details-kib / --page-kib）。
+遅延・500 エラー・429（Retry-After 付き）を指定した割合で混ぜられる。
+
+Usage:
+  python bench/steam_standin.py --port 8765
+  python bench/steam_standin.py --port 8765 --latency 0.05 --error-rate 0.01 --throttle-rate 0.02
+  python fetch_steam.py --base-url http://127.0.0.1:8765 --rate 100 --burst 20
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fetch_steam import HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, SNAPSHOTS_DIR, ResponseCache  # noqa: E402
+
+REAL_BASE_URL = "https://store.steampowered.com"
+DEFAULT_DETAILS_KIB = 8
+DEFAULT_PAGE_KIB = 600
+# ストアページ中でタグ配列が現れる位置（先頭からの割合）
+TAG_POSITION = 0.55
+# 埋め草の単語（同じ文の繰り返しだと gzip が効きすぎて転送量が本物より小さくなる）
+FILLER_WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+                "et dolore magna aliqua steam game review store news community").split()
+
+
+def load_records(snapshots_dir: Path = SNAPSHOTS_DIR) -> list[dict]:
+    """記録済みの個別レコード（data/snapshots/{appid}.json）を appid 順に読む"""
+    records = []
+    for path in sorted(snapshots_dir.glob("*.json"), key=lambda p: p.stem):
+        if not path.stem.isdigit():
+            continue  # 日付別スナップショット
+        with open(path, encoding="utf-8") as f:
+            records.append(json.load(f))
+    return sorted(records, key=lambda r: r["appid"])
+
+
+class StandinData:
+    """記録済みレコードから各エンドポイントの応答本文を組み立てる"""
+
+    def __init__(self, records: list[dict], details_kib: int = DEFAULT_DETAILS_KIB, page_kib: int = DEFAULT_PAGE_KIB):
+        if not records:
+            raise ValueError("レコードがありません")
+        self.records = records
+        self.by_appid = {r["appid"]: r for r in records}
+        self.details_kib = details_kib
+        self.page_kib = page_kib
+        # タグ名（英語）→ 合成タグID。日本語名はレコード内の並びで対応づける
+        names_en: dict[str, str] = {}
+        for record in records:
+            for en, ja in zip(record.get("tags_en", []), record.get("tags_ja", [])):
+                names_en.setdefault(en, ja)
+        self.tag_ids = {name: i for i, name in enumerate(sorted(names_en), 1)}
+        self.tag_names = {
+            "english": [{"tagid": i, "name": name} for name, i in self.tag_ids.items()],
+            "japanese": [{"tagid": i, "name": names_en[name]} for name, i in self.tag_ids.items()],
+        }
+
+    def record(self, appid: int) -> dict:
+        return self.by_appid.get(appid) or self.records[appid % len(self.records)]
+
+    def app_details(self, appid: int, lang: str) -> dict:
+        """appdetails の data 部分（extract_game_info が読むフィールド）"""
+        r = self.record(appid)
+        suffix = "en" if lang == "english" else "ja"
+        description = r.get(f"short_description_{suffix}", "")
+        filler = (description or "lorem ipsum ") * (self.details_kib * 1024 // max(len(description.encode()), 1) + 1)
+        data = {
+            "type": "game",
+            "name": r.get(f"name_{suffix}", r.get("name", "")),
+            "steam_appid": appid,
+            "required_age": r.get("required_age", 0),
+            "is_free": r.get("is_free", False),
+            "detailed_description": filler[:self.details_kib * 1024],
+            "short_description": description,
+            "supported_languages": r.get("supported_languages", ""),
+            "header_image": r.get("header_image", ""),
+            "capsule_image": r.get("capsule_image", ""),
+            "website": r.get("website", ""),
+            "developers": r.get("developers", []),
+            "publishers": r.get("publishers", []),
+            "platforms": r.get("platforms", {}),
+            "categories": [{"description": c} for c in r.get("categories", [])],
+            "genres": [{"description": g} for g in r.get(f"genres_{suffix}", [])],
+            "screenshots": [{"path_full": s} for s in r.get("screenshots", [])],
+            "movies": [
+                {"name": m.get("name", ""), "thumbnail": m.get("thumbnail", ""),
+                 "mp4": {"480": m.get("url_480", ""), "max": m.get("url_max", "")}}
+                for m in r.get("movies", [])
+            ],
+            "recommendations": {"total": r.get("recommendations_total", 0)},
+            "release_date": {"coming_soon": bool(r.get("coming_soon")), "date": r.get(f"release_date_{suffix}", "")},
+        }
+        if not r.get("is_free"):
+            data["price_overview"] = self.price_overview(appid)
+        if r.get("metacritic_score") is not None:
+            data["metacritic"] = {"score": r["metacritic_score"]}
+        if r.get("demo_appid"):
+            data["demos"] = [{"appid": r["demo_appid"]}]
+        return data
+
+    def price_overview(self, appid: int) -> dict:
+        r = self.record(appid)
+        return {
+            "currency": r.get("currency", "JPY"),
+            "initial": r.get("price_initial", 0),
+            "final": r.get("price_final", 0),
+            "discount_percent": r.get("discount_percent", 0),
+            "final_formatted": r.get("price_formatted", ""),
+        }
+
+    def reviews(self, appid: int) -> dict:
+        r = self.record(appid)
+        return {"success": 1, "query_summary": {
+            "num_reviews": 0,
+            "review_score_desc": r.get("review_score_desc", ""),
+            "total_positive": r.get("total_positive", 0),
+            "total_negative": r.get("total_negative", 0),
+            "total_reviews": r.get("total_reviews", 0),
+        }}
+
+    def store_page(self, appid: int) -> bytes:
+        """ストアページ相当の HTML（タグ配列は全体の TAG_POSITION 付近）。同じレコードなら同じページ"""
+        return self._page(self.record(appid)["appid"])
+
+    @lru_cache(maxsize=None)
+    def _page(self, record_appid: int) -> bytes:
+        r = self.by_appid[record_appid]
+        tags = [{"tagid": self.tag_ids[name], "name": name, "count": 1000 - i * 50, "browseable": True}
+                for i, name in enumerate(r.get("tags_en", []))]
+        script = f"InitAppTagModal( {r['appid']}, {json.dumps(tags)}, [], 'https://store.steampowered.com/tag/', {r['appid']}, false );"
+        size = self.page_kib * 1024
+        head = _filler(random.Random(record_appid), int(size * TAG_POSITION))
+        tail = _filler(random.Random(-record_appid), int(size * (1 - TAG_POSITION)))
+        return (f"<!DOCTYPE html>\n<html><head><title>{r.get('name', '')}</title></head><body>\n"
+                + head + f"<script>{script}</script>\n" + tail + "</body></html>\n").encode()
+
+
+def _filler(rng: random.Random, size: int) -> str:
+    blocks = []
+    total = 0
+    while total < size:
+        block = f"<div class=\"block\"><p>{' '.join(rng.choices(FILLER_WORDS, k=40))}</p></div>\n"
+        blocks.append(block)
+        total += len(block)
+    return "".join(blocks)
+
+
+class StandinServer(ThreadingHTTPServer):
+    """応答の組み立て・障害の注入・リクエスト数とバイト数の集計を持つサーバー"""
+
+    daemon_threads = True
+
+    def __init__(self, address, data: StandinData, latency: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: int = 1, seed: int = 0, replay: ResponseCache | None = None):
+        super().__init__(address, StandinHandler)
+        self.data = data
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.replay = replay
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset_counters()
+
+    def handle_error(self, request, client_address):
+        # ストアページの途中で切られた接続などは数えるだけで、トレースバックは出さない
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests: dict[str, int] = {}
+            self.statuses: dict[int, int] = {}
+            self.bytes_sent = 0
+            self.replayed = 0
+
+    def count(self, route: str, status: int, nbytes: int, replayed: bool = False):
+        with self.lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.bytes_sent += nbytes
+            self.replayed += replayed
+
+    def counters(self) -> dict:
+        with self.lock:
+            return {
+                "requests": sum(self.requests.values()),
+                "by_route": dict(sorted(self.requests.items())),
+                "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+                "bytes": self.bytes_sent,
+                "replayed": self.replayed,
+            }
+
+    def fault(self) -> int | None:
+        """注入する障害のステータス（なければ None）"""
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 500
+        return None
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive（fetch_steam の接続プールを効かせる）
+    server: StandinServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        segments = [s for s in parts.path.split("/") if s]
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        route = segments[0] if segments else ""
+        if route == "api":
+            route = "appdetails" if segments[1:] == ["appdetails"] else "unknown"
+            if route == "appdetails" and query.get("filters") == "price_overview":
+                route = "prices"
+        elif route in ("appreviews", "app"):
+            route = route if len(segments) == 2 and segments[1].isdigit() else "unknown"
+            route = "storepage" if route == "app" else route
+        elif route == "tagdata" and segments[1:2] == ["populartags"] and len(segments) == 3:
+            route = "populartags"
+        else:
+            route = "unknown"
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        status = self.server.fault()
+        if status == 429:
+            self._send(route, 429, b"", "text/plain", {"Retry-After": str(self.server.retry_after)})
+            return
+        if status == 500 or route == "unknown":
+            self._send(route, 500 if status else 404, b"", "text/plain")
+            return
+
+        if self.server.replay is not None:
+            cached = self.server.replay.load(REAL_BASE_URL + self.path)
+            if cached and not cached[0].get("partial"):
+                self._send(route, 200, cached[1], self._content_type(route), replayed=True)
+                return
+
+        try:
+            body = self._body(route, segments, query)
+        except (KeyError, ValueError):
+            self._send(route, 400, b"", "text/plain")
+            return
+        self._send(route, 200, body, self._content_type(route))
+
+    @staticmethod
+    def _content_type(route: str) -> str:
+        return "text/html; charset=UTF-8" if route == "storepage" else "application/json; charset=utf-8"
+
+    def _body(self, route: str, segments: list[str], query: dict) -> bytes:
+        data = self.server.data
+        if route == "prices":
+            result = {}
+            for appid in (int(a) for a in query["appids"].split(",")):
+                result[str(appid)] = {"success": True, "data": (
+                    [] if data.record(appid).get("is_free") else {"price_overview": data.price_overview(appid)}
+                )}
+        elif route == "appdetails":
+            appid = int(query["appids"])
+            result = {str(appid): {"success": True, "data": data.app_details(appid, query.get("l", "japanese"))}}
+        elif route == "appreviews":
+            result = data.reviews(int(segments[1]))
+        elif route == "populartags":
+            result = data.tag_names.get(segments[2], data.tag_names["english"])
+        else:
+            return data.store_page(int(segments[1]))
+        return json.dumps(result, ensure_ascii=False).encode()
+
+    def _send(self, route: str, status: int, body: bytes, content_type: str, extra: dict | None = None,
+              replayed: bool = False):
+        headers = {"Content-Type": content_type, **(extra or {})}
+        if status == 200:
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            headers["ETag"] = etag
+            headers["Cache-Control"] = "no-cache"
+            if self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+            elif "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                body = _gzip_page(body) if route == "storepage" else gzip.compress(body, compresslevel=6, mtime=0)
+                headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ストアページはタグ配列を読んだ時点でクライアントが切る
+        self.server.count(route, status, len(body), replayed)
+
+
+@lru_cache(maxsize=None)
+def _gzip_page(body: bytes) -> bytes:
+    # ストアページはレコードの数しか種類がないので圧縮結果を覚えておく
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def start(data: StandinData, host: str = "127.0.0.1", port: int = 0, **options) -> StandinServer:
+    """バックグラウンドのスレッドでサーバーを起動する（port=0 なら空きポート）。止めるときは shutdown()"""
+    server = StandinServer((host, port), data, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Steam ストアのローカル・スタンドインサーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="1リクエストごとの遅延 (秒)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 を返す割合")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429 を返す割合")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 の Retry-After (秒)")
+    parser.add_argument("--seed", type=int, default=0, help="障害注入の乱数シード")
+    parser.add_argument("--details-kib", type=int, default=DEFAULT_DETAILS_KIB, help="appdetails の説明文の大きさ")
+    parser.add_argument("--page-kib", type=int, default=DEFAULT_PAGE_KIB, help="ストアページの大きさ")
+    parser.add_argument("--replay-cache", type=Path, nargs="?", const=HTTP_CACHE_DIR,
+                        help=f"記録済みの応答を返す HTTP キャッシュ (既定: {HTTP_CACHE_DIR.relative_to(ROOT)})")
+    args = parser.parse_args(argv)
+
+    data = StandinData(load_records(), args.details_kib, args.page_kib)
+    server = StandinServer((args.host, args.port), data, latency=args.latency, error_rate=args.error_rate,
+                           throttle_rate=args.throttle_rate, retry_after=args.retry_after, seed=args.seed,
+                           replay=ResponseCache(args.replay_cache, HTTP_CACHE_MAX_BYTES) if args.replay_cache else None)
+    print(f"スタンドイン起動: {server.base_url} (レコード {len(data.records)}件, タグ {len(data.tag_ids)}件)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.counters(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
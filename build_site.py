@@ -3,13 +3,27 @@
 stdlib のみ使用。Markdown は簡易パーサーで変換。
 """
 
+import argparse
+import cProfile
+import hashlib
 import json
+import os
+import pstats
 import re
 import shutil
-import urllib.request
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 
+import asset_metadata
+import deploy_manifest
+import postprocess
+import price_history
+import snapshot_store
+
 BASE_DIR = Path(__file__).resolve().parent
 SNAPSHOTS_DIR = BASE_DIR / "data" / "snapshots"
 CONTENT_DIR = BASE_DIR / "content"
@@ -17,8 +31,27 @@ CONTENT_EN_DIR = BASE_DIR / "content" / "en"
 SITE_DIR = BASE_DIR / "steam"
 GAMES_PATH = BASE_DIR / "games.json"
 TEMPLATE_DIR = BASE_DIR / "templates"
-HISTORY_CACHE_PATH = BASE_DIR / "data" / "history-cache.json"
+PRICE_HISTORY_DIR = BASE_DIR / "data" / "price-history"
+ASSET_METADATA_PATH = BASE_DIR / "data" / "asset-metadata.json"
 BUILD_SCRIPT_PATH = Path(__file__).resolve()
+# 記事ページの出力を左右するコード（どれかが変われば全記事を作り直す。CSS は内容ハッシュ入りのファイル名で入力に含まれる）
+RENDERER_SOURCES = (BUILD_SCRIPT_PATH, BASE_DIR / "postprocess.py", BASE_DIR / "asset_metadata.py")
+BUILD_MANIFEST_PATH = BASE_DIR / "data" / "cache" / "build-manifest.json"
+RENDER_CACHE_DIR = BASE_DIR / "data" / "cache" / "render"
+I18N_JS_PATH = BASE_DIR / "data" / "cache" / "i18n-data.js"  # 内容ハッシュ入りの名前で SITE_DIR に置く元ファイル
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEPLOY_MANIFEST_PATH = BASE_DIR / "data" / "cache" / "deploy-manifest.json"
+DEPLOYED_MANIFEST_PATH = BASE_DIR / "data" / "deployed-manifest.json"
+DEPLOY_DIFF_PATH = BASE_DIR / "data" / "cache" / "deploy-diff.json"
+BUILD_REPORT_PATH = BASE_DIR / "data" / "cache" / "build-report.json"
+BUILD_PROFILE_PATH = BASE_DIR / "data" / "cache" / "build.prof"
+
+# 一覧表示では使わず、カードを開いたときに data/games/{appid}.json から読むフィールド
+DETAIL_FIELDS = (
+    "capsule_image", "developers", "publishers", "categories", "currency", "metacritic_score",
+    "platforms", "supported_languages", "website", "screenshots", "movies", "demo_appid",
+    "recommendations_total", "total_negative", "fetched_at",
+)
 
 
 def load_game_list() -> list[dict]:
@@ -27,56 +60,242 @@ def load_game_list() -> list[dict]:
 
 
 def load_latest_snapshot() -> dict | None:
-    """最新の日次スナップショットを読み込む"""
-    files = sorted(SNAPSHOTS_DIR.glob("2*-*-*.json"), reverse=True)
-    if not files:
-        return None
-    with open(files[0], encoding="utf-8") as f:
-        return json.load(f)
+    """最新の日次スナップショットを読み込む（キーフレーム + 差分から復元）"""
+    return snapshot_store.read_snapshot(directory=SNAPSHOTS_DIR)
+
+
+def load_price_history() -> price_history.PriceHistory | None:
+    """全日次スナップショットから価格履歴を構築（列指向ストアに未反映の日だけ追記）"""
+    history, added = price_history.update(SNAPSHOTS_DIR, PRICE_HISTORY_DIR)
+    if added:
+        print(f"  価格履歴更新: {added}件の新規スナップショット")
+    else:
+        print(f"  価格履歴使用: 新規スナップショットなし")
+    return history
 
 
-def load_price_history() -> dict:
-    """全日次スナップショットから価格履歴を構築（キャッシュ付き）"""
-    cache = {"files_processed": [], "history": {}}
-    if HISTORY_CACHE_PATH.exists():
+def file_hash(path: Path, length: int = 64) -> str:
+    """ファイル内容の sha256（キャッシュバスティング用に短くもできる）"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:length]
+
+
+def load_build_manifest() -> dict:
+    """出力ごとの入力ハッシュと同期した静的ファイル（前回ビルド時）を読み込む"""
+    if BUILD_MANIFEST_PATH.exists():
         try:
-            with open(HISTORY_CACHE_PATH, encoding="utf-8") as f:
-                cache = json.load(f)
-        except (json.JSONDecodeError, KeyError):
-            cache = {"files_processed": [], "history": {}}
+            with open(BUILD_MANIFEST_PATH, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if isinstance(manifest.get("outputs"), dict):
+                return manifest
+        except json.JSONDecodeError:
+            pass
+    return {"outputs": {}}
+
+
+def save_build_manifest(manifest: dict):
+    # 出力が消えたエントリは落とす
+    manifest["outputs"] = {
+        name: digest for name, digest in sorted(manifest["outputs"].items()) if (SITE_DIR / name).exists()
+    }
+    BUILD_MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(BUILD_MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """内容が変わるときだけ書き込む（mtime を保ち、デプロイで再アップロードさせない）"""
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    path.write_text(text, encoding="utf-8")
+    return True
+
 
-    processed = set(cache.get("files_processed", []))
-    history = cache.get("history", {})
-    new_files = 0
+def sync_tree(src: Path, dest: Path, previous: dict | None = None, exclude: set | frozenset = frozenset(),
+              link: bool = False) -> dict[str, str]:
+    """src 以下のファイルを dest に同期する（サイズと内容ハッシュが違うものだけコピー）
 
-    for f in sorted(SNAPSHOTS_DIR.glob("2*-*-*.json")):
-        if f.name in processed:
+    previous は前回同期したファイル（相対パス → sha256）で、ここにあって今回 src に無いものだけ dest から消す。
+    link=True なら変わったファイルをハードリンクで置く（同じ inode になるので dest 側を直接書き換えないこと。
+    別デバイスならコピー）。戻り値は今回同期したファイルの相対パス → sha256。
+    """
+    synced = {}
+    copied = linked = 0
+    for path in sorted(p for p in src.rglob("*") if p.is_file()):
+        rel = path.relative_to(src).as_posix()
+        if rel in exclude:
             continue
-        with open(f, encoding="utf-8") as fh:
-            snap = json.load(fh)
-        date = snap.get("date", "")
-        for game in snap.get("games", []):
-            appid = str(game["appid"])
-            if appid not in history:
-                history[appid] = []
-            history[appid].append({
-                "date": date,
-                "price_final": game.get("price_final", 0),
-                "discount_percent": game.get("discount_percent", 0),
-            })
-        processed.add(f.name)
-        new_files += 1
-
-    if new_files > 0:
-        cache["files_processed"] = sorted(processed)
-        cache["history"] = history
-        with open(HISTORY_CACHE_PATH, "w", encoding="utf-8") as f:
-            json.dump(cache, f, ensure_ascii=False)
-        print(f"  価格履歴キャッシュ更新: {new_files}件の新規スナップショット")
-    else:
-        print(f"  価格履歴キャッシュ使用: 新規スナップショットなし")
+        digest = file_hash(path)
+        synced[rel] = digest
+        target = dest / rel
+        if target.is_file() and target.stat().st_size == path.stat().st_size:
+            if os.path.samefile(path, target) or file_hash(target) == digest:
+                continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.unlink(missing_ok=True)
+        hard_linked = False
+        if link:
+            try:
+                os.link(path, tmp)
+                hard_linked = True
+            except OSError:
+                pass
+        if hard_linked:
+            linked += 1
+        else:
+            shutil.copy2(path, tmp)
+            copied += 1
+        os.replace(tmp, target)
+
+    removed = 0
+    for rel in sorted(set(previous or {}) - set(synced)):
+        target = dest / rel
+        if target.is_file():
+            target.unlink()
+            removed += 1
+        # 空になったディレクトリも片付ける
+        parent = target.parent
+        while parent != dest and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+
+    unchanged = len(synced) - copied - linked
+    STATS.count("assets_copied", copied + linked)
+    STATS.count("assets_removed", removed)
+    print(f"  静的ファイル同期: {copied}件コピー" + (f", {linked}件リンク" if linked else "")
+          + (f", {removed}件削除" if removed else "") + f", {unchanged}件変更なし")
+    return synced
+
+
+def fingerprint_assets(sources: dict[str, Path], previous: dict) -> dict[str, str]:
+    """アセットを縮小して内容ハッシュ入りのファイル名（style.<hash>.css 等）で SITE_DIR に置き、名前 → その名前を返す
+
+    ハッシュは縮小後の内容から取る。中身が同じなら名前も同じなので、既にあれば書かない。previous（名前 → [現在, 1つ前]）はその場で更新する。
+    古い HTML をキャッシュしているクライアントのために1つ前の世代までは残し、それより古いものは消す。
+    """
+    names = {}
+    for name, src in sources.items():
+        stem, ext = name.rsplit(".", 1)
+        original = src.read_text(encoding="utf-8")
+        data = postprocess.minify(name, original).encode("utf-8")
+        hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}.{ext}"
+        names[name] = hashed
+        target = SITE_DIR / hashed
+        if not target.exists():
+            tmp = target.with_name(target.name + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, target)
+            print(f"  アセット: {hashed} ({len(original.encode('utf-8')) / 1024:.1f}KiB → {len(data) / 1024:.1f}KiB)")
+
+        generations = previous.get(name) or []
+        if not generations or generations[0] != hashed:
+            generations = [hashed] + generations[:1]
+        previous[name] = generations
+        pattern = re.compile(rf"{re.escape(stem)}\.[0-9a-f]{{10}}\.{ext}")
+        for old in SITE_DIR.glob(f"{stem}.*.{ext}"):
+            if pattern.fullmatch(old.name) and old.name not in generations:
+                old.unlink()
+    return names
+
+
+def run_jobs(pool: ProcessPoolExecutor | None, func, items: list) -> list:
+    """items を func で処理する。pool があればプロセス並列（結果は items の順）"""
+    if pool is None or len(items) < 2:
+        return [func(item) for item in items]
+    chunksize = max(1, len(items) // ((os.cpu_count() or 1) * 4))
+    return list(pool.map(func, items, chunksize=chunksize))
+
+
+def _process_io() -> tuple[int, int] | None:
+    """このプロセスがこれまでに読み書きしたバイト数（/proc/self/io が読めない環境では None）"""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
 
-    return history
+
+class BuildStats:
+    """フェーズ別の実時間・CPU 時間・読み書きバイト数と、処理件数を集計"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.phases: dict[str, dict] = {}
+        self.counts: dict[str, int] = {}
+        self._stack: list[str] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """with STATS.phase("名前"): で囲んだ区間を計測する（入れ子は "親/子" として記録）"""
+        key = "/".join(self._stack + [name])
+        entry = self.phases.setdefault(key, {"wall": 0.0, "cpu": 0.0, "read": None, "written": None})
+        self._stack.append(name)
+        io_before = _process_io()
+        wall_before = time.perf_counter()
+        cpu_before = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_before
+            cpu = time.process_time() - cpu_before
+            io_after = _process_io()
+            self._stack.pop()
+            entry["wall"] += wall
+            entry["cpu"] += cpu
+            if io_before and io_after:
+                entry["read"] = (entry["read"] or 0) + io_after[0] - io_before[0]
+                entry["written"] = (entry["written"] or 0) + io_after[1] - io_before[1]
+
+    def count(self, name: str, n: int = 1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def as_dict(self, jobs: int = 1) -> dict:
+        return {
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "jobs": jobs,
+            "wall": round(time.perf_counter() - self.started, 4),
+            "cpu": round(time.process_time() - self.cpu_started, 4),
+            "phases": {
+                name: {k: round(v, 4) if isinstance(v, float) else v for k, v in entry.items()}
+                for name, entry in self.phases.items()
+            },
+            "counts": dict(sorted(self.counts.items())),
+        }
+
+    def report(self, path: Path = BUILD_REPORT_PATH, jobs: int = 1):
+        """集計を表示し、JSON として保存する（前回の JSON があれば合計時間を比較）"""
+        previous = None
+        try:
+            with open(path, encoding="utf-8") as f:
+                previous = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+        result = self.as_dict(jobs)
+
+        print(f"\nビルド統計: 実時間 {result['wall']:.2f}秒 / CPU {result['cpu']:.2f}秒 (jobs={jobs}, CPU・I/O は親プロセス分)")
+        for name, entry in result["phases"].items():
+            depth = name.count("/")
+            label = "  " * depth + name.rsplit("/", 1)[-1]
+            io = ""
+            if entry["read"] is not None:
+                io = f"  読込 {entry['read'] / 1024:.0f}KiB  書込 {entry['written'] / 1024:.0f}KiB"
+            print(f"  {label:<20} {entry['wall'] * 1000:>8.0f}ms  CPU {entry['cpu'] * 1000:>6.0f}ms{io}")
+        if result["counts"]:
+            print("  件数: " + ", ".join(f"{k} {v}" for k, v in result["counts"].items()))
+        if previous and previous.get("wall"):
+            diff = result["wall"] - previous["wall"]
+            print(f"  前回比: {diff:+.2f}秒 (前回 {previous['wall']:.2f}秒, {previous.get('finished_at', '-')})")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+
+STATS = BuildStats()
 
 
 def parse_markdown_frontmatter(text: str) -> tuple[dict, str]:
@@ -104,11 +323,24 @@ DIALOGUE_CHARS = {
 }
 
 
+# 行・インライン記法のパターン（毎回 re のキャッシュを引かないようにモジュール読み込み時にコンパイル）
+BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+EM_RE = re.compile(r'\*(.+?)\*')
+LINK_RE = re.compile(r'\[(.+?)\]\((.+?)\)')
+PROFILE_START_RE = re.compile(r'>>\s*(scala|kotori)\s*$')
+DIALOGUE_RE = re.compile(r'>\s*(scala|kotori)\s*:\s*(.+)')
+STEAM_CARD_RE = re.compile(r'!steam\[(\d+)\]\((.+?)\)\s*$')
+IMAGE_RE = re.compile(r'!\[(.+?)\]\((.+?)\)\s*$')
+
+
 def inline_markdown(text: str) -> str:
-    """インラインMarkdown変換"""
-    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
-    text = re.sub(r'\*(.+?)\*', r'<em>\1</em>', text)
-    text = re.sub(r'\[(.+?)\]\((.+?)\)', r'<a href="\2">\1</a>', text)
+    """インラインMarkdown変換（記号を含まない部分は正規表現を通さない）"""
+    if "*" in text:
+        if "**" in text:
+            text = BOLD_RE.sub(r'<strong>\1</strong>', text)
+        text = EM_RE.sub(r'<em>\1</em>', text)
+    if "](" in text:
+        text = LINK_RE.sub(r'<a href="\2">\1</a>', text)
     return text
 
 
@@ -128,7 +360,8 @@ PET_SAFETY_LABELS = {
 }
 
 
-def simple_markdown_to_html(md: str, lang: str = "ja", img_prefix: str = "../", pet_safety: str = "") -> str:
+def simple_markdown_to_html(md: str, lang: str = "ja", img_prefix: str = "../", pet_safety: str = "",
+                            card_images: dict | None = None) -> str:
     """最低限のMarkdown→HTML変換（対話記法・プロフィール記法対応）
 
     対話記法: > キャラID: セリフ
@@ -139,7 +372,10 @@ def simple_markdown_to_html(md: str, lang: str = "ja", img_prefix: str = "../",
     例: >> scala
         プロフィール本文
         <<
+
+    !steam[appid](名前) カードの画像は card_images（appid → ヘッダー画像 URL）から引く（無ければ CDN の既定パス）。
     """
+    card_images = card_images or {}
     lines = md.split("\n")
     html_lines = []
     in_paragraph = False
@@ -162,9 +398,11 @@ def simple_markdown_to_html(md: str, lang: str = "ja", img_prefix: str = "../",
 
     for line in lines:
         stripped = line.strip()
+        # 行頭の1文字で候補の記法を絞る（> 対話・プロフィール / ! 画像・カード / # 見出し）
+        first = stripped[:1]
 
         # プロフィール開始: >> scala / >> kotori
-        profile_start = re.match(r'^>>\s*(scala|kotori)\s*$', stripped)
+        profile_start = PROFILE_START_RE.match(stripped) if first == ">" else None
         if profile_start:
             close_paragraph()
             in_profile = True
@@ -207,7 +445,7 @@ def simple_markdown_to_html(md: str, lang: str = "ja", img_prefix: str = "../",
             continue
 
         # 対話記法: > scala: セリフ  / > kotori: セリフ
-        dialogue_match = re.match(r'^>\s*(scala|kotori)\s*:\s*(.+)', stripped)
+        dialogue_match = DIALOGUE_RE.match(stripped) if first == ">" else None
         if dialogue_match:
             close_paragraph()
             char_id = dialogue_match.group(1)
@@ -226,21 +464,22 @@ def simple_markdown_to_html(md: str, lang: str = "ja", img_prefix: str = "../",
             continue
 
         # Steam OGP カード: !steam[appid](ゲーム名)
-        steam_match = re.match(r'^!steam\[(\d+)\]\((.+?)\)\s*$', stripped)
+        steam_match = STEAM_CARD_RE.match(stripped) if first == "!" else None
         if steam_match:
             close_paragraph()
             s_appid = steam_match.group(1)
             s_name = steam_match.group(2)
+            s_img = card_images.get(s_appid) or asset_metadata.default_header_image(s_appid)
             html_lines.append(
                 f'<a href="https://store.steampowered.com/app/{s_appid}/" target="_blank" class="steam-ogp-card">'
-                f'<img src="https://cdn.akamai.steamstatic.com/steam/apps/{s_appid}/header.jpg" alt="{s_name}" class="steam-ogp-img">'
+                f'<img src="{s_img}" alt="{s_name}" class="steam-ogp-img">'
                 f'<span class="steam-ogp-name">{s_name}</span>'
                 f'</a>'
             )
             continue
 
         # 画像: ![alt](src)
-        img_match = re.match(r'^!\[(.+?)\]\((.+?)\)\s*$', stripped)
+        img_match = IMAGE_RE.match(stripped) if first == "!" else None
         if img_match:
             close_paragraph()
             alt = img_match.group(1)
@@ -295,23 +534,119 @@ def simple_markdown_to_html(md: str, lang: str = "ja", img_prefix: str = "../",
     return "\n".join(html_lines)
 
 
-def load_articles(content_dir: Path = CONTENT_DIR, lang: str = "ja", img_prefix: str = "../") -> dict:
+class RenderCache:
+    """Markdown 変換結果のディスクキャッシュ（ファイルの mtime を最終利用時刻とみなしてサイズ上限で LRU 削除）"""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self._size = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: dict):
+        path = self._path(key)
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.directory.glob("*.json"))
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """古く使われたものから、上限の 8 割に収まるまで削除する"""
+        files = sorted(((p.stat().st_mtime, p.stat().st_size, p) for p in self.directory.glob("*.json")))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes * 0.8:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+
+RENDER_CACHE = RenderCache(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES)
+_renderer_version = None
+
+
+def renderer_version() -> str:
+    """変換結果を左右するコード（RENDERER_SOURCES）をまとめたハッシュ"""
+    global _renderer_version
+    if _renderer_version is None:
+        digest = hashlib.sha256()
+        for path in RENDERER_SOURCES:
+            digest.update(path.name.encode("utf-8") + b"\0" + path.read_bytes())
+        _renderer_version = digest.hexdigest()
+    return _renderer_version
+
+
+def render_markdown(body: str, lang: str = "ja", img_prefix: str = "../", pet_safety: str = "",
+                    card_images: dict | None = None) -> tuple[str, str]:
+    """本文を HTML に変換し、(本文 HTML, 犬猫セクション HTML) を返す（render キャッシュ付き）"""
+    # カードの画像は本文が参照する appid の分だけキーに含める
+    cards = {appid: (card_images or {}).get(appid, "") for appid in sorted(asset_metadata.CARD_RE.findall(body))}
+    key_source = json.dumps([renderer_version(), lang, img_prefix, pet_safety, cards, body], ensure_ascii=False)
+    key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+    cached = RENDER_CACHE.get(key)
+    if cached is not None:
+        return cached["html"], cached["pet_html"]
+
+    html = simple_markdown_to_html(body, lang=lang, img_prefix=img_prefix, pet_safety=pet_safety, card_images=card_images)
+    # pet_safety セクションを本文から分離（記事の外に配置するため）
+    pet_html = ""
+    pet_idx = html.find('<div class="pet-safety-section')
+    if pet_idx >= 0:
+        pet_html = html[pet_idx:]
+        html = html[:pet_idx].rstrip()
+    RENDER_CACHE.put(key, {"html": html, "pet_html": pet_html})
+    return html, pet_html
+
+
+def _load_article(md_file: Path, lang: str, img_prefix: str, card_images: dict | None = None) -> tuple[str, dict, bool]:
+    """1記事分の Markdown を読み込んで HTML に変換する（3つ目は render キャッシュを使えたか）"""
+    slug = md_file.stem
+    text = md_file.read_text(encoding="utf-8")
+    meta, body = parse_markdown_frontmatter(text)
+    hits = RENDER_CACHE.hits
+    html, pet_html = render_markdown(body, lang=lang, img_prefix=img_prefix, pet_safety=meta.get("pet_safety", ""),
+                                     card_images=card_images)
+    return slug, {"meta": meta, "html": html, "pet_html": pet_html, "slug": slug}, RENDER_CACHE.hits > hits
+
+
+def load_articles(content_dir: Path = CONTENT_DIR, lang: str = "ja", img_prefix: str = "../",
+                  pool: ProcessPoolExecutor | None = None, card_images: dict | None = None) -> dict:
     """指定ディレクトリの *.md を読み込み、slug → {meta, html} のマップを返す"""
-    articles = {}
     if not content_dir.exists():
-        return articles
-    for md_file in sorted(content_dir.glob("*.md")):
-        slug = md_file.stem
-        text = md_file.read_text(encoding="utf-8")
-        meta, body = parse_markdown_frontmatter(text)
-        html = simple_markdown_to_html(body, lang=lang, img_prefix=img_prefix, pet_safety=meta.get("pet_safety", ""))
-        # pet_safety セクションを本文から分離（記事の外に配置するため）
-        pet_html = ""
-        pet_idx = html.find('<div class="pet-safety-section')
-        if pet_idx >= 0:
-            pet_html = html[pet_idx:]
-            html = html[:pet_idx].rstrip()
-        articles[slug] = {"meta": meta, "html": html, "pet_html": pet_html, "slug": slug}
+        return {}
+    md_files = sorted(content_dir.glob("*.md"))
+    articles = {}
+    for slug, art, cached in run_jobs(pool, partial(_load_article, lang=lang, img_prefix=img_prefix, card_images=card_images), md_files):
+        articles[slug] = art
+        STATS.count("markdown_cached" if cached else "markdown_rendered")
     return articles
 
 
@@ -333,7 +668,38 @@ def cleanup_orphaned_articles(articles: dict, articles_en: dict | None = None):
         print(f"  計{cleaned}件の孤立記事を削除")
 
 
-def build_data_json(snapshot: dict, history: dict, articles: dict, articles_en: dict = None):
+def write_game_details(games: list[dict], runs: dict, details_dir: Path):
+    """appid 別の詳細ファイル（詳細フィールド + そのゲームの価格履歴）を出力。内容が同じなら書き換えない"""
+    details_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    appids = set()
+    for g in games:
+        appid = g["appid"]
+        appids.add(str(appid))
+        detail = {"appid": appid}
+        detail.update({k: g[k] for k in DETAIL_FIELDS if k in g})
+        detail["history"] = {
+            "until": runs.get("until", ""),
+            "gaps": runs.get("gaps", []),
+            "runs": runs.get("games", {}).get(str(appid), []),
+        }
+        text = json.dumps(detail, ensure_ascii=False, separators=(",", ":"))
+        path = details_dir / f"{appid}.json"
+        if path.exists() and path.read_text(encoding="utf-8") == text:
+            continue
+        path.write_text(text, encoding="utf-8")
+        written += 1
+
+    removed = 0
+    for path in details_dir.glob("*.json"):
+        if path.stem not in appids:
+            path.unlink()
+            removed += 1
+    STATS.count("game_details_written", written)
+    print(f"  ゲーム詳細: {written}件更新" + (f", {removed}件削除" if removed else ""))
+
+
+def build_data_json(snapshot: dict, history: price_history.PriceHistory | None, articles: dict, articles_en: dict = None):
     """site/data/ にダッシュボード用JSONを出力"""
     data_dir = SITE_DIR / "data"
     data_dir.mkdir(parents=True, exist_ok=True)
@@ -401,17 +767,21 @@ def build_data_json(snapshot: dict, history: dict, articles: dict, articles_en:
                 entry["featured"] = True
             games.append(entry)
 
+    # 一覧用の軽いインデックス（詳細フィールドは appid 別ファイルへ）
     games_data = {
         "date": snapshot.get("date", ""),
         "timestamp": snapshot.get("timestamp", ""),
-        "games": games,
+        "games": [{k: v for k, v in g.items() if k not in DETAIL_FIELDS} for g in games],
     }
     with open(data_dir / "games.json", "w", encoding="utf-8") as f:
-        json.dump(games_data, f, ensure_ascii=False, indent=2)
+        json.dump(games_data, f, ensure_ascii=False, separators=(",", ":"))
 
-    # 価格履歴
+    # 価格履歴（価格が変わった日だけのラン形式。形式は README 参照）
+    runs = price_history.encode_runs(history)
     with open(data_dir / "history.json", "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+        json.dump(runs, f, ensure_ascii=False, separators=(",", ":"))
+
+    write_game_details(games, runs, data_dir / "games")
 
     # 記事一覧
     article_list = []
@@ -433,142 +803,145 @@ def build_data_json(snapshot: dict, history: dict, articles: dict, articles_en:
                 "lang": "en",
             })
     with open(data_dir / "articles.json", "w", encoding="utf-8") as f:
-        json.dump(article_list, f, ensure_ascii=False, indent=2)
+        json.dump(article_list, f, ensure_ascii=False, separators=(",", ":"))
 
 
-def build_article_pages(articles: dict, lang: str = "ja", snapshot: dict | None = None, other_lang_slugs: set | None = None):
-    """Markdown記事をHTMLページとして出力（差分ビルド対応）"""
-    # appid → header_image マップ構築
-    header_images = {}
-    if snapshot:
-        for g in snapshot.get("games", []):
-            header_images[str(g.get("appid", ""))] = g.get("header_image", "")
-    if lang == "en":
-        articles_dir = SITE_DIR / "articles" / "en"
-        content_dir = CONTENT_EN_DIR
-        prefix = "../../"
-        html_lang = "en"
-        top_label = "Top"
-        store_label = "Steam Store Page"
-        site_name = "The Wonderful Steam Game Shelf"
-    else:
-        articles_dir = SITE_DIR / "articles"
-        content_dir = CONTENT_DIR
-        prefix = "../"
-        html_lang = "ja"
-        top_label = "トップ"
-        store_label = "Steam ストアページ"
-        site_name = "すばらしきSteamゲームの本棚"
-
-    articles_dir.mkdir(parents=True, exist_ok=True)
-    build_script_mtime = BUILD_SCRIPT_PATH.stat().st_mtime
+ARTICLE_PAGE_SETTINGS = {
+    "ja": {
+        "prefix": "../",
+        "top_label": "トップ",
+        "store_label": "Steam ストアページ",
+        "site_name": "すばらしきSteamゲームの本棚",
+    },
+    "en": {
+        "prefix": "../../",
+        "top_label": "Top",
+        "store_label": "Steam Store Page",
+        "site_name": "The Wonderful Steam Game Shelf",
+    },
+}
 
-    for slug, art in articles.items():
-        out_path = articles_dir / f"{slug}.html"
-        md_path = content_dir / f"{slug}.md"
 
-        # 差分ビルド: .md と build_site.py の両方が出力より古ければスキップ
-        if out_path.exists() and md_path.exists():
-            out_mtime = out_path.stat().st_mtime
-            if md_path.stat().st_mtime < out_mtime and build_script_mtime < out_mtime:
-                continue
-        meta = art["meta"]
-        title = meta.get("title", slug)
-        appid = meta.get("appid", "")
-
-        if appid:
-            header_img = header_images.get(str(appid), f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/header.jpg")
-            ogp_card = (
-                f'<a href="https://store.steampowered.com/app/{appid}/" target="_blank" class="steam-ogp-card">'
-                f'<img src="{header_img}" alt="{title}" class="steam-ogp-img">'
-                f'<span class="steam-ogp-name">{store_label}</span>'
-                f'</a>'
-            )
-        else:
-            ogp_card = ""
-
-        # EmoteLab クレジット（記事外に配置）
-        emotelab_appid = meta.get("emotelab", "")
-        if emotelab_appid:
-            emotelab_img = header_images.get(str(emotelab_appid), "")
-            if not emotelab_img:
-                try:
-                    url = f"https://store.steampowered.com/api/appdetails?appids={emotelab_appid}"
-                    with urllib.request.urlopen(url, timeout=10) as resp:
-                        api = json.loads(resp.read())
-                    emotelab_img = api[str(emotelab_appid)]["data"]["header_image"]
-                except Exception:
-                    emotelab_img = f"https://cdn.akamai.steamstatic.com/steam/apps/{emotelab_appid}/header.jpg"
-            credit_label = "このサイトのキャラクターは EmoteLab で作成しました" if lang == "ja" else "Characters on this site were created with EmoteLab"
-            emotelab_html = (
-                f'<div class="emotelab-credit">'
-                f'<p>{credit_label}</p>'
-                f'<a href="https://store.steampowered.com/app/{emotelab_appid}/" target="_blank" class="steam-ogp-card">'
-                f'<img src="{emotelab_img}" alt="EmoteLab" class="steam-ogp-img">'
-                f'<span class="steam-ogp-name">EmoteLab</span>'
-                f'</a>'
-                f'</div>'
-            )
-        else:
-            emotelab_html = ""
-
-        # SEO: description を最初の対話行から抽出
-        desc_text = ""
-        for dline in art["html"].split("\n"):
-            if "dialogue-bubble" in dline:
-                # dialogue-name タグを除去してからテキスト抽出
-                text = re.sub(r'<span class="dialogue-name">.*?</span>', '', dline)
-                text = re.sub(r'<[^>]+>', '', text).strip()
-                if text:
-                    desc_text = text
-                    if len(desc_text) > 120:
-                        desc_text = desc_text[:117] + "..."
-                    break
-        if not desc_text:
-            desc_text = f"{title} - {site_name}"
-
-        # OG image: ゲーム記事ならSteamヘッダー画像、それ以外はサイトOGP画像
-        if appid:
-            og_image = header_images.get(str(appid), f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/header.jpg")
-        else:
-            og_image = "https://steam.subara3.com/img/ogp.png"
+def load_header_images(snapshot: dict, strict: bool = False) -> dict[str, str]:
+    """appid → ヘッダー画像 URL（スナップショット + data/asset-metadata.json）
 
-        if lang == "en":
-            canonical_url = f"https://steam.subara3.com/articles/en/{slug}.html"
-            ja_url = f"https://steam.subara3.com/articles/{slug}.html"
-            en_url = canonical_url
-        else:
-            canonical_url = f"https://steam.subara3.com/articles/{slug}.html"
-            ja_url = canonical_url
-            en_url = f"https://steam.subara3.com/articles/en/{slug}.html"
-
-        # hreflang: 対応する他言語版が存在する場合のみ出力
-        hreflang_tags = ""
-        if other_lang_slugs and slug in other_lang_slugs:
-            hreflang_tags = (
-                f'\n<link rel="alternate" hreflang="ja" href="{ja_url}">'
-                f'\n<link rel="alternate" hreflang="en" href="{en_url}">'
-                f'\n<link rel="alternate" hreflang="x-default" href="{ja_url}">'
-            )
+    記事が参照している（emotelab・!steam カード）のにどちらにも無い appid は、既定の CDN パスで
+    代用して警告する。strict なら代用せずに中断する（ビルド中は Store API に問い合わせない）。
+    """
+    images = {appid: entry.get("header_image", "") for appid, entry in asset_metadata.load(ASSET_METADATA_PATH).items()}
+    for g in snapshot.get("games", []):
+        if g.get("header_image"):
+            images[str(g["appid"])] = g["header_image"]
+    refs = asset_metadata.collect_references((CONTENT_DIR, CONTENT_EN_DIR))
+    missing = [f"    appid={appid} ({', '.join(files)})" for appid, files in refs.items() if not images.get(appid)]
+    if missing and strict:
+        raise SystemExit("記事が参照するゲームのメタデータがありません (先に fetch_steam.py を実行してください):\n"
+                         + "\n".join(missing))
+    if missing:
+        print(f"  アセット情報なし ({len(missing)}件, 既定の画像 URL を使用):")
+        print("\n".join(missing))
+    return images
+
+
+def render_article_page(slug: str, art: dict, lang: str, header_images: dict, other_lang_slugs: set | None,
+                        css_file: str = "style.css") -> str:
+    """1記事分のHTMLページを組み立てる（ファイルには書かない。css_file は内容ハッシュ入りの CSS ファイル名）"""
+    settings = ARTICLE_PAGE_SETTINGS["en" if lang == "en" else "ja"]
+    prefix = settings["prefix"]
+    html_lang = "en" if lang == "en" else "ja"
+    top_label = settings["top_label"]
+    store_label = settings["store_label"]
+    site_name = settings["site_name"]
+
+    meta = art["meta"]
+    title = meta.get("title", slug)
+    appid = meta.get("appid", "")
+
+    if appid:
+        header_img = header_images.get(str(appid), f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/header.jpg")
+        ogp_card = (
+            f'<a href="https://store.steampowered.com/app/{appid}/" target="_blank" class="steam-ogp-card">'
+            f'<img src="{header_img}" alt="{title}" class="steam-ogp-img">'
+            f'<span class="steam-ogp-name">{store_label}</span>'
+            f'</a>'
+        )
+    else:
+        ogp_card = ""
+
+    # EmoteLab クレジット（記事外に配置）
+    emotelab_appid = meta.get("emotelab", "")
+    if emotelab_appid:
+        emotelab_img = header_images.get(str(emotelab_appid)) or asset_metadata.default_header_image(emotelab_appid)
+        credit_label = "このサイトのキャラクターは EmoteLab で作成しました" if lang == "ja" else "Characters on this site were created with EmoteLab"
+        emotelab_html = (
+            f'<div class="emotelab-credit">'
+            f'<p>{credit_label}</p>'
+            f'<a href="https://store.steampowered.com/app/{emotelab_appid}/" target="_blank" class="steam-ogp-card">'
+            f'<img src="{emotelab_img}" alt="EmoteLab" class="steam-ogp-img">'
+            f'<span class="steam-ogp-name">EmoteLab</span>'
+            f'</a>'
+            f'</div>'
+        )
+    else:
+        emotelab_html = ""
+
+    # SEO: description を最初の対話行から抽出
+    desc_text = ""
+    for dline in art["html"].split("\n"):
+        if "dialogue-bubble" in dline:
+            # dialogue-name タグを除去してからテキスト抽出
+            text = re.sub(r'<span class="dialogue-name">.*?</span>', '', dline)
+            text = re.sub(r'<[^>]+>', '', text).strip()
+            if text:
+                desc_text = text
+                if len(desc_text) > 120:
+                    desc_text = desc_text[:117] + "..."
+                break
+    if not desc_text:
+        desc_text = f"{title} - {site_name}"
+
+    # OG image: ゲーム記事ならSteamヘッダー画像、それ以外はサイトOGP画像
+    if appid:
+        og_image = header_images.get(str(appid), f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/header.jpg")
+    else:
+        og_image = "https://steam.subara3.com/img/ogp.png"
 
-        og_image_tag = f'\n<meta property="og:image" content="{og_image}">'
-        og_locale = "ja_JP" if lang == "ja" else "en_US"
-        twitter_card = "summary_large_image"
-
-        # メタキーワード
-        tags = meta.get("tags", [])
-        keywords_tag = ""
-        if tags:
-            keywords_str = ",".join(tags) if isinstance(tags, list) else tags
-            keywords_tag = f'\n<meta name="keywords" content="{keywords_str}">'
-
-        # JSON-LD: Article + BreadcrumbList
-        json_ld_image = f'"image": "{og_image}",'
-        desc_escaped = desc_text.replace('"', '\\"')
-        title_escaped = title.replace('"', '\\"')
-        date_published = meta.get("date", "")
-        json_ld_date = f'"datePublished": "{date_published}",' if date_published else ""
-        json_ld = f'''<script type="application/ld+json">
+    if lang == "en":
+        canonical_url = f"https://steam.subara3.com/articles/en/{slug}.html"
+        ja_url = f"https://steam.subara3.com/articles/{slug}.html"
+        en_url = canonical_url
+    else:
+        canonical_url = f"https://steam.subara3.com/articles/{slug}.html"
+        ja_url = canonical_url
+        en_url = f"https://steam.subara3.com/articles/en/{slug}.html"
+
+    # hreflang: 対応する他言語版が存在する場合のみ出力
+    hreflang_tags = ""
+    if other_lang_slugs and slug in other_lang_slugs:
+        hreflang_tags = (
+            f'\n<link rel="alternate" hreflang="ja" href="{ja_url}">'
+            f'\n<link rel="alternate" hreflang="en" href="{en_url}">'
+            f'\n<link rel="alternate" hreflang="x-default" href="{ja_url}">'
+        )
+
+    og_image_tag = f'\n<meta property="og:image" content="{og_image}">'
+    og_locale = "ja_JP" if lang == "ja" else "en_US"
+    twitter_card = "summary_large_image"
+
+    # メタキーワード
+    tags = meta.get("tags", [])
+    keywords_tag = ""
+    if tags:
+        keywords_str = ",".join(tags) if isinstance(tags, list) else tags
+        keywords_tag = f'\n<meta name="keywords" content="{keywords_str}">'
+
+    # JSON-LD: Article + BreadcrumbList
+    json_ld_image = f'"image": "{og_image}",'
+    desc_escaped = desc_text.replace('"', '\\"')
+    title_escaped = title.replace('"', '\\"')
+    date_published = meta.get("date", "")
+    json_ld_date = f'"datePublished": "{date_published}",' if date_published else ""
+    json_ld = f'''<script type="application/ld+json">
 [{{
   "@context": "https://schema.org",
   "@type": "Article",
@@ -594,7 +967,7 @@ def build_article_pages(articles: dict, lang: str = "ja", snapshot: dict | None
 }}]
 </script>'''
 
-        html = f"""<!DOCTYPE html>
+    html = f"""<!DOCTYPE html>
 <html lang="{html_lang}" data-theme="dark">
 <head>
 <meta charset="utf-8">
@@ -617,7 +990,7 @@ def build_article_pages(articles: dict, lang: str = "ja", snapshot: dict | None
 <link rel="dns-prefetch" href="https://cdn.akamai.steamstatic.com">
 <link rel="preconnect" href="https://cdn.akamai.steamstatic.com" crossorigin>
 <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/@picocss/pico@2/css/pico.min.css">
-<link rel="stylesheet" href="{prefix}style.css">
+<link rel="stylesheet" href="{prefix}{css_file}">
 {json_ld}
 <script async src="https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js?client=ca-pub-7086371722392050"
      crossorigin="anonymous"></script>
@@ -652,136 +1025,278 @@ def build_article_pages(articles: dict, lang: str = "ja", snapshot: dict | None
 </footer>
 </body>
 </html>"""
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(html)
-        print(f"  記事生成 ({lang}): {out_path.name}")
+    return html
+
+
+def _write_article_page(item: tuple[str, dict, Path], lang: str, header_images: dict, other_lang_slugs: set | None,
+                        css_file: str) -> str:
+    """記事ページを生成して書き出す（プロセスプールのワーカーからも呼ばれる）"""
+    slug, art, out_path = item
+    html = postprocess.minify_html(render_article_page(slug, art, lang, header_images, other_lang_slugs, css_file))
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return out_path.name
+
+
+def article_input_hash(slug: str, art: dict, lang: str, header_images: dict, other_lang_slugs: set | None,
+                       builder_hash: str, css_file: str) -> str:
+    """記事ページの出力を決める入力すべてのハッシュ"""
+    meta = art["meta"]
+    inputs = {
+        "lang": lang,
+        "meta": meta,
+        "html": art["html"],
+        "pet_html": art.get("pet_html", ""),
+        "header_image": header_images.get(str(meta.get("appid", "")), ""),
+        "emotelab_image": header_images.get(str(meta.get("emotelab", "")), ""),
+        "hreflang": bool(other_lang_slugs and slug in other_lang_slugs),
+        "builder": builder_hash,
+        "css": css_file,
+    }
+    return hashlib.sha256(json.dumps(inputs, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
 
 
-def main():
+def build_article_pages(articles: dict, lang: str = "ja", header_images: dict | None = None,
+                        other_lang_slugs: set | None = None, pool: ProcessPoolExecutor | None = None,
+                        manifest: dict | None = None, css_file: str = "style.css"):
+    """Markdown記事をHTMLページとして出力（入力ハッシュが前回と同じならスキップ、pool があれば並列）
+
+    header_images は appid → ヘッダー画像 URL（load_header_images の結果）。
+    """
+    header_images = header_images or {}
+    articles_dir = SITE_DIR / "articles" / "en" if lang == "en" else SITE_DIR / "articles"
+    articles_dir.mkdir(parents=True, exist_ok=True)
+    outputs = manifest["outputs"] if manifest is not None else {}
+    builder_hash = renderer_version()
+
+    items = []
+    digests = {}
+    for slug, art in articles.items():
+        out_path = articles_dir / f"{slug}.html"
+        name = out_path.relative_to(SITE_DIR).as_posix()
+        digest = article_input_hash(slug, art, lang, header_images, other_lang_slugs, builder_hash, css_file)
+        # 差分ビルド: 入力が前回と同じで出力も残っていればスキップ
+        if outputs.get(name) == digest and out_path.exists():
+            continue
+        items.append((slug, art, out_path))
+        digests[name] = digest
+
+    write = partial(_write_article_page, lang=lang, header_images=header_images,
+                    other_lang_slugs=other_lang_slugs, css_file=css_file)
+    for name in run_jobs(pool, write, items):
+        print(f"  記事生成 ({lang}): {name}")
+    outputs.update(digests)
+    skipped = len(articles) - len(items)
+    STATS.count("articles_rendered", len(items))
+    STATS.count("articles_skipped", skipped)
+    if skipped:
+        print(f"  記事スキップ ({lang}): {skipped}件 (入力に変更なし)")
+
+
+def report_compression(compressed: dict, updated: list):
+    """作り直した圧縮ファイルごとの削減量と、全体の合計を表示する"""
+    for rel, size, sizes in updated:
+        detail = ", ".join(f"{kind} {packed / 1024:.1f}KiB (-{(1 - packed / size) * 100:.0f}%)" for kind, packed in sizes.items())
+        print(f"  圧縮: {rel} {size / 1024:.1f}KiB → {detail}")
+    total = sum((SITE_DIR / rel).stat().st_size for rel in compressed)
+    packed_total = sum((SITE_DIR / f"{rel}.gz").stat().st_size for rel in compressed if (SITE_DIR / f"{rel}.gz").exists())
+    STATS.count("compressed_files", len(updated))
+    if total:
+        print(f"事前圧縮: {len(updated)}件更新, 全{len(compressed)}件 {total / 1024:.0f}KiB → gz {packed_total / 1024:.0f}KiB "
+              f"(-{(1 - packed_total / total) * 100:.0f}%)")
+
+
+def write_deploy_manifest():
+    """出力ごとのサイズ・内容ハッシュと、最後にデプロイできた状態からの差分を書き出す"""
+    current = deploy_manifest.scan(SITE_DIR)
+    changes = deploy_manifest.diff(deploy_manifest.load(DEPLOYED_MANIFEST_PATH), current)
+    deploy_manifest.save(current, DEPLOY_MANIFEST_PATH)
+    deploy_manifest.save(changes, DEPLOY_DIFF_PATH)
+    STATS.count("deploy_changed", len(changes["changed"]))
+    STATS.count("deploy_deleted", len(changes["deleted"]))
+    print(f"デプロイ差分: 送信 {len(changes['changed'])}件 ({changes['bytes'] / 1024:.0f}KiB), "
+          f"削除 {len(changes['deleted'])}件 / 全{len(current['files'])}件")
+
+
+def build(pool: ProcessPoolExecutor | None, strict_assets: bool = False, link_assets: bool = False):
     print("サイトビルド開始...")
 
-    snapshot = load_latest_snapshot()
+    with STATS.phase("snapshot"):
+        snapshot = load_latest_snapshot()
     if not snapshot:
         print("スナップショットなし。先に fetch_steam.py を実行してください。")
         return
 
-    history = load_price_history()
-    articles = load_articles()
-    articles_en = load_articles(CONTENT_EN_DIR, lang="en", img_prefix="../../")
+    with STATS.phase("assets"):
+        header_images = load_header_images(snapshot, strict=strict_assets)
+    with STATS.phase("history"):
+        history = load_price_history()
+    with STATS.phase("markdown"):
+        articles = load_articles(pool=pool, card_images=header_images)
+        articles_en = load_articles(CONTENT_EN_DIR, lang="en", img_prefix="../../", pool=pool, card_images=header_images)
     print(f"スナップショット: {snapshot['date']} ({len(snapshot['games'])}本)")
     print(f"記事: {len(articles)}本 (ja), {len(articles_en)}本 (en)")
 
     # data JSON 出力
-    build_data_json(snapshot, history, articles, articles_en)
+    with STATS.phase("data_json"):
+        build_data_json(snapshot, history, articles, articles_en)
     print(f"データJSON出力完了")
 
     # 孤立記事の削除
-    cleanup_orphaned_articles(articles, articles_en)
-
-    # 記事ページ生成（差分ビルド）
-    en_slugs = set(articles_en.keys()) if articles_en else set()
-    ja_slugs = set(articles.keys()) if articles else set()
-    if articles:
-        build_article_pages(articles, lang="ja", snapshot=snapshot, other_lang_slugs=en_slugs)
-    if articles_en:
-        build_article_pages(articles_en, lang="en", snapshot=snapshot, other_lang_slugs=ja_slugs)
+    with STATS.phase("cleanup"):
+        cleanup_orphaned_articles(articles, articles_en)
 
     # i18n インライン JS 生成
-    i18n_path = TEMPLATE_DIR / "i18n.json"
-    if i18n_path.exists():
-        with open(i18n_path, encoding="utf-8") as f:
-            i18n_data = f.read().strip()
-        with open(SITE_DIR / "i18n-data.js", "w", encoding="utf-8") as f:
-            f.write(f"window.__i18n={i18n_data};")
-        print("i18nインラインJS生成完了")
+    with STATS.phase("i18n"):
+        i18n_path = TEMPLATE_DIR / "i18n.json"
+        if i18n_path.exists():
+            with open(i18n_path, encoding="utf-8") as f:
+                i18n_data = f.read().strip()
+            i18n_data = json.dumps(json.loads(i18n_data), ensure_ascii=False, separators=(",", ":"))
+            I18N_JS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            write_if_changed(I18N_JS_PATH, f"window.__i18n={i18n_data};")
+            print("i18nインラインJS生成完了")
+
+    # CSS/JS を内容ハッシュ入りのファイル名で置く（中身が変わらなければ名前も変わらない）
+    manifest = load_build_manifest()
+    with STATS.phase("fingerprint"):
+        sources = {"style.css": TEMPLATE_DIR / "style.css", "app.js": TEMPLATE_DIR / "app.js",
+                   "i18n-data.js": I18N_JS_PATH}
+        asset_names = fingerprint_assets({name: src for name, src in sources.items() if src.exists()},
+                                         manifest.setdefault("fingerprints", {}))
+        # 公開するのはハッシュ入りの名前だけ。以前のビルドが置いたハッシュなしの複製は消す
+        for name in asset_names:
+            (SITE_DIR / name).unlink(missing_ok=True)
+    css_file = asset_names.get("style.css", "style.css")
+
+    # 記事ページ生成（差分ビルド）
+    with STATS.phase("pages"):
+        en_slugs = set(articles_en.keys()) if articles_en else set()
+        ja_slugs = set(articles.keys()) if articles else set()
+        if articles:
+            build_article_pages(articles, lang="ja", header_images=header_images, other_lang_slugs=en_slugs, pool=pool,
+                                manifest=manifest, css_file=css_file)
+        if articles_en:
+            build_article_pages(articles_en, lang="en", header_images=header_images, other_lang_slugs=ja_slugs,
+                                pool=pool, manifest=manifest, css_file=css_file)
 
     # sitemap.xml 生成
-    base_url = "https://steam.subara3.com"
-    today = datetime.now().strftime("%Y-%m-%d")
-    sitemap_urls = [
-        {"loc": f"{base_url}/", "priority": "1.0", "changefreq": "daily"},
-    ]
-    for slug in articles:
-        sitemap_urls.append({
-            "loc": f"{base_url}/articles/{slug}.html",
-            "priority": "0.8",
-            "changefreq": "weekly",
-        })
-    for slug in articles_en:
-        sitemap_urls.append({
-            "loc": f"{base_url}/articles/en/{slug}.html",
-            "priority": "0.7",
-            "changefreq": "weekly",
-        })
-    sitemap_xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    sitemap_xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    for u in sitemap_urls:
-        sitemap_xml += f'  <url>\n'
-        sitemap_xml += f'    <loc>{u["loc"]}</loc>\n'
-        sitemap_xml += f'    <lastmod>{today}</lastmod>\n'
-        sitemap_xml += f'    <changefreq>{u["changefreq"]}</changefreq>\n'
-        sitemap_xml += f'    <priority>{u["priority"]}</priority>\n'
-        sitemap_xml += f'  </url>\n'
-    sitemap_xml += '</urlset>\n'
-    with open(SITE_DIR / "sitemap.xml", "w", encoding="utf-8") as f:
-        f.write(sitemap_xml)
-    print("sitemap.xml 生成完了")
-
-    # robots.txt 生成
-    robots_txt = f"User-agent: *\nAllow: /\n\nSitemap: {base_url}/sitemap.xml\n"
-    with open(SITE_DIR / "robots.txt", "w", encoding="utf-8") as f:
-        f.write(robots_txt)
-    print("robots.txt 生成完了")
-
-    # 静的ファイルコピー (templates/ → site/)
-    for src in (TEMPLATE_DIR,):
-        if src.exists():
-            for f in src.iterdir():
-                if f.is_file():
-                    shutil.copy2(f, SITE_DIR / f.name)
-                elif f.is_dir():
-                    dest = SITE_DIR / f.name
-                    if dest.exists():
-                        shutil.rmtree(dest)
-                    shutil.copytree(f, dest)
-
-    # Cache busting: add ?v=timestamp to CSS/JS references
-    ver = datetime.now().strftime("%Y%m%d%H%M")
-    index_path = SITE_DIR / "index.html"
-    if index_path.exists():
-        html = index_path.read_text(encoding="utf-8")
-        html = html.replace('href="style.css"', f'href="style.css?v={ver}"')
-        html = html.replace('src="app.js"', f'src="app.js?v={ver}"')
-        html = html.replace('src="i18n-data.js"', f'src="i18n-data.js?v={ver}"')
-
-        # noscript にゲーム一覧を注入（SEO/AI検索対策）
-        noscript_items = []
-        games_json_path = SITE_DIR / "data" / "games.json"
-        _games_data = json.loads(games_json_path.read_text(encoding="utf-8")) if games_json_path.exists() else {}
-        for g in _games_data.get("games", []):
-            name = g.get("name", "")
-            appid = g.get("appid", "")
-            price = g.get("price_formatted", "")
-            discount = g.get("discount_percent", 0)
-            price_info = f" ({price}" + (f", -{discount}%" if discount else "") + ")" if price else ""
-            noscript_items.append(
-                f'<li><a href="https://store.steampowered.com/app/{appid}/">{name}</a>{price_info}</li>'
-            )
-        if noscript_items:
-            noscript_html = "<ul>\n    " + "\n    ".join(noscript_items) + "\n  </ul>"
-            html = html.replace("<!-- __NOSCRIPT_GAMES__ -->", noscript_html)
+    with STATS.phase("sitemap"):
+        base_url = "https://steam.subara3.com"
+        today = datetime.now().strftime("%Y-%m-%d")
+        sitemap_urls = [
+            {"loc": f"{base_url}/", "priority": "1.0", "changefreq": "daily"},
+        ]
+        for slug in articles:
+            sitemap_urls.append({
+                "loc": f"{base_url}/articles/{slug}.html",
+                "priority": "0.8",
+                "changefreq": "weekly",
+            })
+        for slug in articles_en:
+            sitemap_urls.append({
+                "loc": f"{base_url}/articles/en/{slug}.html",
+                "priority": "0.7",
+                "changefreq": "weekly",
+            })
+        sitemap_xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
+        sitemap_xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for u in sitemap_urls:
+            sitemap_xml += f'  <url>\n'
+            sitemap_xml += f'    <loc>{u["loc"]}</loc>\n'
+            sitemap_xml += f'    <lastmod>{today}</lastmod>\n'
+            sitemap_xml += f'    <changefreq>{u["changefreq"]}</changefreq>\n'
+            sitemap_xml += f'    <priority>{u["priority"]}</priority>\n'
+            sitemap_xml += f'  </url>\n'
+        sitemap_xml += '</urlset>\n'
+        with open(SITE_DIR / "sitemap.xml", "w", encoding="utf-8") as f:
+            f.write(sitemap_xml)
+        print("sitemap.xml 生成完了")
+
+        # robots.txt 生成
+        robots_txt = f"User-agent: *\nAllow: /\n\nSitemap: {base_url}/sitemap.xml\n"
+        write_if_changed(SITE_DIR / "robots.txt", robots_txt)
+        print("robots.txt 生成完了")
+
+    # 静的ファイル同期 (templates/ → site/、変わったものだけ。index.html は下でテンプレートから生成、
+    # style.css / app.js は上でハッシュ入りの名前で置いたので同期しない)
+    with STATS.phase("templates"):
+        fingerprinted = {name for name, src in sources.items() if src.parent == TEMPLATE_DIR}
+        manifest["assets"] = sync_tree(TEMPLATE_DIR, SITE_DIR, manifest.get("assets"),
+                                       exclude={"index.html", *fingerprinted}, link=link_assets)
+
+    # index.html: CSS/JS の参照を内容ハッシュ入りのファイル名に置き換える
+    with STATS.phase("index"):
+        index_template = TEMPLATE_DIR / "index.html"
+        if index_template.exists():
+            html = index_template.read_text(encoding="utf-8")
+            for name, hashed in asset_names.items():
+                attr = "href" if name.endswith(".css") else "src"
+                html = html.replace(f'{attr}="{name}"', f'{attr}="{hashed}"')
+
+            # noscript にゲーム一覧を注入（SEO/AI検索対策）
+            noscript_items = []
+            games_json_path = SITE_DIR / "data" / "games.json"
+            _games_data = json.loads(games_json_path.read_text(encoding="utf-8")) if games_json_path.exists() else {}
+            for g in _games_data.get("games", []):
+                name = g.get("name", "")
+                appid = g.get("appid", "")
+                price = g.get("price_formatted", "")
+                discount = g.get("discount_percent", 0)
+                price_info = f" ({price}" + (f", -{discount}%" if discount else "") + ")" if price else ""
+                noscript_items.append(
+                    f'<li><a href="https://store.steampowered.com/app/{appid}/">{name}</a>{price_info}</li>'
+                )
+            if noscript_items:
+                noscript_html = "<ul>\n    " + "\n    ".join(noscript_items) + "\n  </ul>"
+                html = html.replace("<!-- __NOSCRIPT_GAMES__ -->", noscript_html)
+
+            write_if_changed(SITE_DIR / "index.html", postprocess.minify_html(html))
 
-        index_path.write_text(html, encoding="utf-8")
+    # テキスト出力の事前圧縮（.gz、brotli があれば .br も。内容が変わったものだけ作り直す）
+    with STATS.phase("compress"):
+        manifest["compressed"], updated = postprocess.precompress(SITE_DIR, manifest.get("compressed"))
+        save_build_manifest(manifest)
+        report_compression(manifest["compressed"], updated)
 
-    for articles_dir in [SITE_DIR / "articles", SITE_DIR / "articles" / "en"]:
-        if articles_dir.exists():
-            for article_html in articles_dir.glob("*.html"):
-                html = article_html.read_text(encoding="utf-8")
-                html = html.replace('href="../style.css"', f'href="../style.css?v={ver}"')
-                article_html.write_text(html, encoding="utf-8")
+    # デプロイ用マニフェストと、最後にデプロイした状態との差分（deploy_ftp.py が読む）
+    with STATS.phase("deploy_manifest"):
+        write_deploy_manifest()
 
     print(f"\nビルド完了: {SITE_DIR}")
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="静的サイト生成")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="記事の変換・生成に使うプロセス数 (1 なら逐次, 0 なら CPU 数)")
+    parser.add_argument("--strict-assets", action="store_true",
+                        help="記事が参照するゲームのメタデータ (data/asset-metadata.json) が欠けていたら中断する")
+    parser.add_argument("--link-assets", action="store_true",
+                        help="templates/ の静的ファイルをコピーせずハードリンクで置く")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"cProfile の結果を {BUILD_PROFILE_PATH.relative_to(BASE_DIR)} に保存し、上位を表示")
+    args = parser.parse_args(argv)
+    jobs = args.jobs or os.cpu_count() or 1
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            build(pool, args.strict_assets, args.link_assets)
+    else:
+        build(None, args.strict_assets, args.link_assets)
+    if profiler:
+        profiler.disable()
+
+    STATS.report(BUILD_REPORT_PATH, jobs)
+    if profiler:
+        BUILD_PROFILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(BUILD_PROFILE_PATH)
+        print(f"\nプロファイル: {BUILD_PROFILE_PATH} (python -m pstats で詳しく見られます)")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+
 if __name__ == "__main__":
     main()